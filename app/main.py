@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -7,9 +8,19 @@ load_dotenv()
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
-from database import database
+from database import database, connect_replicas, disconnect_replicas
+from app.responses import FastJSONResponse
+from app.scraper.page_cache import page_cache
+from app.services.blob_cache import resume_cache
+from app.services.facets_service import facets_refresh_loop
+from app.services.job_service import job_cache, suggestion_cache
+from app.services.lifecycle_service import archive_loop
+from app.services.pagination import count_cache
+from app.services.scrape_service import scrape_scheduler_loop, stop_scrape_runs
+from app.services.users_services import user_cache
 from app.routes.auth import router as auth_router
 from app.routes.jobs import router as jobs_router
 from app.routes.resume import router as resume_router
@@ -29,9 +40,18 @@ async def lifespan(app: FastAPI):
         logger.info("Database connected successfully.")
     except Exception as e:
         logger.error(f" Database connection failed: {str(e)}")
+    await connect_replicas()
+    facets_task = asyncio.create_task(facets_refresh_loop())
+    archive_task = asyncio.create_task(archive_loop())
+    scheduler_task = asyncio.create_task(scrape_scheduler_loop())
 
     yield  # Allow FastAPI to run
 
+    facets_task.cancel()
+    archive_task.cancel()
+    scheduler_task.cancel()
+    await stop_scrape_runs()
+    await disconnect_replicas()
     try:
         await database.disconnect()
         logger.info(" Database disconnected successfully.")
@@ -39,7 +59,7 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database disconnection failed: {str(e)}")
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Middleware for debugging requests
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SESSION_SECRET"))
@@ -52,6 +72,9 @@ origins = [
     "https://cp-v1-gfcvakcrdnd8gsgh.ukwest-01.azurewebsites.net",  # Secure backend URL
 ]
 
+# Compress larger JSON bodies such as job listings
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -83,3 +106,15 @@ def root():
 @app.get("/health")
 async def root():
     return {"message": "Health Okay"}
+
+@app.get("/health/cache")
+async def cache_stats():
+    """Hit rates and sizes of the in-process and shared caches."""
+    return {
+        "jobs": job_cache.stats(),
+        "users": user_cache.stats(),
+        "list_totals": count_cache.stats(),
+        "suggestions": suggestion_cache.stats(),
+        "resume_files": resume_cache.stats(),
+        "scraper_pages": page_cache.stats(),
+    }
@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any):
+    """Serialize the types orjson does not handle natively."""
+    # databases.Record
+    if hasattr(obj, "_mapping"):
+        return dict(obj._mapping)
+    # asyncpg.Record and other mappings
+    if hasattr(obj, "keys") and hasattr(obj, "__getitem__"):
+        return {key: obj[key] for key in obj.keys()}
+    if isinstance(obj, Decimal):
+        # Same rule as FastAPI's encoder: whole numbers become ints
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson. Database records, UUIDs, datetimes and
+    dates are encoded directly, so routes can return rows without running
+    FastAPI's generic jsonable_encoder over every field first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
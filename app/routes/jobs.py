@@ -1,56 +1,213 @@
-from fastapi import APIRouter, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Request
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 from app.services.job_service import (
     fetch_jobs_from_db,
     fetch_job_by_id,
-    scrape_and_save_jobs_service,
+    suggest_job_values,
+)
+from app.services.scrape_service import (
+    cancel_scrape_run,
+    create_scrape_schedule,
+    delete_scrape_schedule,
+    get_scrape_run,
+    list_scrape_runs,
+    list_scrape_schedules,
+    start_scrape_run,
+)
+from app.services.facets_service import fetch_job_facets
+from app.services.http_cache import (
+    DETAIL_CACHE_CONTROL,
+    LIST_CACHE_CONTROL,
+    compute_etag,
+    conditional_response,
+    rows_etag,
 )
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])  #  Add prefix and tags
 
+
+def check_salary_range(salary_min: Optional[int], salary_max: Optional[int]):
+    """Reject an inverted salary range, which Postgres cannot build a numrange from."""
+    if salary_min is not None and salary_max is not None and salary_min > salary_max:
+        raise HTTPException(status_code=400, detail="salary_min must not be greater than salary_max")
+
+
 @router.get("/")
 async def get_jobs(
+    request: Request,
     page: int = Query(1, ge=1), 
     limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor; takes precedence over page"),
+    q: Optional[str] = Query(None, description="Full-text search over title, company, location and description"),
     title: Optional[str] = Query(None, description="Filter by job title"),
+    company: Optional[str] = Query(None, description="Filter by company"),
     job_type: Optional[str] = Query(None, description="Filter by job type (e.g., Full-time, Part-time)"),
     location: Optional[str] = Query(None, description="Filter by location"),
     remote: Optional[str] = Query(None, description="Filter by remote status (On-site, Remote, Hybrid)"),
-    salary_min: Optional[int] = Query(None, description="Minimum salary filter"),
-    salary_max: Optional[int] = Query(None, description="Maximum salary filter"),
-    date_posted: Optional[str] = Query("Any time", description="Filter by date posted (e.g., 'Past 24 hours', 'Past week')")
+    salary_min: Optional[int] = Query(None, description="Minimum annual salary filter"),
+    salary_max: Optional[int] = Query(None, description="Maximum annual salary filter"),
+    date_posted: Optional[str] = Query("Any time", description="Filter by date posted (e.g., 'Past 24 hours', 'Past week')"),
+    fuzzy: bool = Query(False, description="Tolerate typos in title, company and location filters"),
+    include_closed: bool = Query(False, description="Include jobs past their closing date that are not yet archived"),
+    collapse_duplicates: bool = Query(False, description="Return one job per cluster of near-duplicate postings"),
+    sort: Optional[str] = Query(None, pattern="^(recent|relevance|similarity)$", description="Result order; defaults to relevance when q is given"),
+    view: Optional[str] = Query(None, pattern="^(full|summary)$", description="'summary' returns list columns and a description snippet"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (add 'snippet' for a description excerpt)"),
+    include_total: bool = Query(True, description="Set to false to skip computing total_jobs"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="'estimate' uses the planner's row estimate for unfiltered totals")
 ):
     """
     Fetch jobs from the database with pagination and optional filters.
+    Pass `cursor` (from `next_cursor`) instead of `page` for constant-cost deep paging.
+    With `q`, results are ranked by relevance and include a highlighted `snippet`.
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
     """
+    check_salary_range(salary_min, salary_max)
     filters = {
+        "q": q,
         "title": title,
+        "company": company,
         "job_type": job_type,
         "location": location,
         "remote": remote,
         "salary_min": salary_min,
         "salary_max": salary_max,
         "date_posted": date_posted,
+        "fuzzy": fuzzy,
+        "include_closed": include_closed,
+        "collapse_duplicates": collapse_duplicates,
     }
     
-    return await fetch_jobs_from_db(page, limit, filters)
+    result = await fetch_jobs_from_db(
+        page, limit, filters, cursor=cursor, include_total=include_total, total_mode=total_mode,
+        sort=sort, fields=fields, view=view,
+    )
+
+    # The query string decides projection and order, the rows' versions decide the content
+    etag = rows_etag(result["jobs"], request.url.query, result["total_jobs"], result["next_cursor"])
+    return conditional_response(request, etag, LIST_CACHE_CONTROL, result)
+
+
+@router.get("/facets")
+async def get_job_facets(
+    q: Optional[str] = Query(None),
+    title: Optional[str] = Query(None),
+    company: Optional[str] = Query(None),
+    job_type: Optional[str] = Query(None),
+    location: Optional[str] = Query(None),
+    remote: Optional[str] = Query(None),
+    salary_min: Optional[int] = Query(None),
+    salary_max: Optional[int] = Query(None),
+    date_posted: Optional[str] = Query("Any time"),
+):
+    """
+    Counts per job type, remote status, location and date bucket for the given filters.
+    Takes the same filters as GET /jobs.
+    """
+    check_salary_range(salary_min, salary_max)
+    filters = {
+        "q": q,
+        "title": title,
+        "company": company,
+        "job_type": job_type,
+        "location": location,
+        "remote": remote,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "date_posted": date_posted,
+    }
+    return await fetch_job_facets(filters)
+
+
+@router.get("/suggest")
+async def suggest(
+    field: str = Query("location", pattern="^(title|company|location)$"),
+    term: str = Query(..., min_length=2, description="Partial or misspelled text typed by the user"),
+    limit: int = Query(10, ge=1, le=25),
+):
+    """
+    Typeahead suggestions for the title, company and location filters.
+    """
+    return await suggest_job_values(field, term, limit)
 
 
 @router.get("/{job_id}")
-async def get_job_by_id(job_id: UUID):
+async def get_job_by_id(job_id: UUID, request: Request):
     """
     Fetch a single job by its ID.
     """
-    return await fetch_job_by_id(job_id)
+    job = await fetch_job_by_id(job_id)
+    etag = compute_etag(job["id"], job.get("updated_at"))
+    return conditional_response(request, etag, DETAIL_CACHE_CONTROL, job)
+
+
+@router.post("/scrape", status_code=202)
+async def scrape_jobs(
+    query: Optional[str] = Body(None, embed=True),
+    queries: Optional[List[str]] = Body(None, embed=True, description="Several queries scraped in parallel in one run"),
+    full: Optional[bool] = Body(None, embed=True, description="Force a full (true) or incremental (false) crawl"),
+):
+    """
+    Start a background scrape of external job listings and return the run.
+    Follow its progress at GET /jobs/scrape/runs/{run_id}.
+    Repeat scrapes of a query stop once they reach jobs already stored,
+    with a periodic full crawl.
+    """
+    return await start_scrape_run(([query] if query else []) + (queries or []), full=full)
+
+
+@router.get("/scrape/runs")
+async def get_scrape_runs(limit: int = Query(20, ge=1, le=100)):
+    """
+    Most recent scrape runs, newest first.
+    """
+    return await list_scrape_runs(limit)
+
+
+@router.get("/scrape/runs/{run_id}")
+async def get_scrape_run_status(run_id: UUID):
+    """
+    Status and progress of a scrape run: pages done, new and skipped jobs, and rates.
+    """
+    return await get_scrape_run(run_id)
+
+
+@router.post("/scrape/runs/{run_id}/cancel")
+async def cancel_scrape(run_id: UUID):
+    """
+    Stop a queued or running scrape run; jobs already saved are kept.
+    """
+    return await cancel_scrape_run(run_id)
+
+
+@router.get("/scrape/schedules")
+async def get_scrape_schedules():
+    """
+    Recurring scrapes.
+    """
+    return await list_scrape_schedules()
+
+
+@router.post("/scrape/schedules", status_code=201)
+async def add_scrape_schedule(
+    name: str = Body(..., embed=True),
+    queries: List[str] = Body(..., embed=True),
+    cron: str = Body(..., embed=True, description="Five-field cron expression in UTC, e.g. '0 */6 * * *', or @hourly/@daily"),
+    full: Optional[bool] = Body(None, embed=True),
+):
+    """
+    Scrape ``queries`` on a recurring cron schedule.
+    """
+    return await create_scrape_schedule(name, queries, cron, full)
 
 
-@router.post("/scrape")
-async def scrape_jobs(query: str = Body(..., embed=True)):
+@router.delete("/scrape/schedules/{schedule_id}")
+async def remove_scrape_schedule(schedule_id: UUID):
     """
-    Scrape jobs from external sources and save them to the database.
+    Delete a recurring scrape; runs already started are not affected.
     """
-    return await scrape_and_save_jobs_service(query)
+    return await delete_scrape_schedule(schedule_id)
 
 
 # @router.post("/scrape-google/")
@@ -1,4 +1,5 @@
-import io
+import asyncio
+import json
 import os
 import uuid
 from database import database
@@ -10,6 +11,8 @@ from typing import Optional
 from pydantic import BaseModel
 from io import BytesIO
 from supabase import create_client, Client
+from app.services.blob_cache import resume_cache
+from app.responses import FastJSONResponse
 
 # Import the enhanced resume services
 from app.services.resume_service import (
@@ -49,6 +52,69 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 # Create router
 router = APIRouter(prefix="/resume", tags=["Resume Processing"])
 
+RESUME_RECORD_COLUMNS = "id, user_id, storage_path, file_name, content_hash, parsed_data"
+
+
+def download_resume_file(storage_path: str, content_hash: Optional[str] = None) -> bytes:
+    """
+    Download a stored resume, serving repeat reads from the local blob cache.
+    Blocking (disk, hashing and storage I/O): call it through asyncio.to_thread.
+    """
+    file_data = resume_cache.get(storage_path, content_hash)
+    if file_data is not None:
+        return file_data
+
+    file_data = supabase.storage.from_("careerpal").download(storage_path)
+    resume_cache.put(storage_path, file_data)
+    return file_data
+
+
+async def load_parsed_resume(record) -> dict:
+    """
+    Returns parsed resume data for a stored resume.
+    Parsing only happens the first time a given file content is seen for a user;
+    the result is saved against the content hash and reused afterwards.
+    """
+    parsed_data = record["parsed_data"]
+    if parsed_data:
+        return json.loads(parsed_data) if isinstance(parsed_data, str) else parsed_data
+
+    try:
+        file_data = await asyncio.to_thread(download_resume_file, record["storage_path"], record["content_hash"])
+    except Exception as storage_error:
+        print(f"Storage Error: {str(storage_error)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch resume from storage: {str(storage_error)}"
+        )
+
+    temp_file = UploadFile(
+        filename=record["file_name"],
+        file=BytesIO(file_data),
+        headers={"content-type": "application/octet-stream"}
+    )
+    resume_data = await extract_resume_text(temp_file)
+
+    if "error" not in resume_data:
+        # Older rows predate fingerprinting, so hash them now as well
+        content_hash = record["content_hash"] or await asyncio.to_thread(resume_cache.content_hash, file_data)
+        await database.execute(
+            """
+            UPDATE resumes
+            SET content_hash = :content_hash, parsed_data = CAST(:parsed_data AS JSONB)
+            WHERE user_id = :user_id AND (id = :resume_id OR content_hash = :content_hash)
+            """,
+            {
+                "content_hash": content_hash,
+                "parsed_data": json.dumps(resume_data),
+                "user_id": record["user_id"],
+                "resume_id": record["id"],
+            }
+        )
+
+    return resume_data
+
+
 # Authentication verification
 def verify_token(token: str = Depends(oauth2_scheme)):
     try:
@@ -101,10 +167,10 @@ async def get_user_resumes(user_id: str = Query(...)):
                 print(f"Failed to generate signed URL for resume {row['id']}: {str(e)}")
                 continue
 
-        return {
+        return FastJSONResponse({
             "message": "✅ Resumes retrieved successfully",
             "resumes": resume_list
-        }
+        })
 
     except Exception as e:
         print(f"Error fetching resumes for user_id {user_id}: {str(e)}")
@@ -129,9 +195,50 @@ async def upload_resume(
                 detail="Unsupported file format. Please upload PDF, DOC, or DOCX files."
             )
             
-        # Read file content
+        # Read file content and fingerprint it
         file_content = await file.read()
-        
+        content_hash = await asyncio.to_thread(resume_cache.content_hash, file_content)
+
+        # Identical content already uploaded by this user: reuse the stored object and row
+        existing = await database.fetch_one(
+            """
+                SELECT id, storage_path
+                FROM resumes
+                WHERE user_id = :user_id AND content_hash = :content_hash
+                ORDER BY uploaded_at DESC
+                LIMIT 1
+            """,
+            {"user_id": user_id, "content_hash": content_hash}
+        )
+        if existing:
+            async with database.transaction():
+                if is_primary:
+                    await database.execute(
+                        "UPDATE resumes SET is_primary = FALSE WHERE user_id = :user_id",
+                        {"user_id": user_id}
+                    )
+                await database.execute(
+                    """
+                        UPDATE resumes
+                        SET file_name = :file_name, uploaded_at = NOW(),
+                            is_primary = is_primary OR :is_primary
+                        WHERE id = :resume_id
+                    """,
+                    {"file_name": file.filename, "is_primary": is_primary, "resume_id": existing["id"]}
+                )
+
+            signed_url = supabase.storage.from_("careerpal").create_signed_url(
+                path=existing["storage_path"],
+                expires_in=3600
+            )
+            return {
+                "message": "Resume uploaded successfully",
+                "file_url": signed_url["signedURL"],
+                "storage_path": existing["storage_path"],
+                "resume_id": existing["id"],
+                "deduplicated": True
+            }
+
         # Generate unique filename
         file_name = f"{uuid.uuid4()}.{file_extension}"
         storage_path = f"resumes/{file_name}"
@@ -143,6 +250,7 @@ async def upload_resume(
                 file=file_content,
                 file_options={"content-type": file.content_type}
             )
+            await asyncio.to_thread(resume_cache.put, storage_path, file_content)
             
             # Generate signed URL
             signed_url = supabase.storage.from_("careerpal").create_signed_url(
@@ -159,8 +267,8 @@ async def upload_resume(
                     )
 
                 query = """
-                    INSERT INTO resumes (user_id, storage_path, file_name, is_primary)
-                    VALUES (:user_id, :storage_path, :file_name, :is_primary)
+                    INSERT INTO resumes (user_id, storage_path, file_name, is_primary, content_hash)
+                    VALUES (:user_id, :storage_path, :file_name, :is_primary, :content_hash)
                     RETURNING id
                 """
                 result = await database.fetch_one(
@@ -169,7 +277,8 @@ async def upload_resume(
                         "user_id": user_id,
                         "storage_path": storage_path,
                         "file_name": file.filename,
-                        "is_primary": is_primary
+                        "is_primary": is_primary,
+                        "content_hash": content_hash
                     }
                 )
 
@@ -177,7 +286,8 @@ async def upload_resume(
                 "message": "Resume uploaded successfully",
                 "file_url": signed_url["signedURL"],
                 "storage_path": storage_path,
-                "resume_id": result["id"] if result else None
+                "resume_id": result["id"] if result else None,
+                "deduplicated": False
             }
 
         except Exception as e:
@@ -215,8 +325,8 @@ async def score_user_resume(
         # If resume_id is provided, fetch from storage
         if resume_id:
             # Verify the resume exists in database
-            query = """
-                SELECT storage_path, file_name
+            query = f"""
+                SELECT {RESUME_RECORD_COLUMNS}
                 FROM resumes
                 WHERE id = :resume_id
                 LIMIT 1
@@ -226,29 +336,8 @@ async def score_user_resume(
             if not record:
                 raise HTTPException(status_code=404, detail="Resume not found")
 
-            try:
-                # Download file from Supabase Storage
-                storage_path = record["storage_path"]
-                file_data = supabase.storage.from_("careerpal").download(storage_path)
-                
-                # Create a temporary file-like object
-                file_like = BytesIO(file_data)
-                
-                # Create UploadFile with correct parameters
-                temp_file = UploadFile(
-                    filename=record["file_name"],
-                    file=file_like,
-                    headers={"content-type": "application/octet-stream"}
-                )
-                
-                # Extract resume data
-                resume_data = await extract_resume_text(temp_file)
-            except Exception as storage_error:
-                print(f"Storage Error: {str(storage_error)}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to fetch resume from storage: {str(storage_error)}"
-                )
+            # Reuse parsed data from an earlier run on the same file
+            resume_data = await load_parsed_resume(record)
         else:
             # Use directly uploaded file
             resume_data = await extract_resume_text(file)
@@ -307,8 +396,8 @@ async def optimize_user_resume(
         # If resume_id is provided, fetch the file from storage
         if resume_id:
             # Verify the resume exists in database
-            query = """
-                SELECT storage_path, file_name
+            query = f"""
+                SELECT {RESUME_RECORD_COLUMNS}
                 FROM resumes
                 WHERE id = :resume_id
                 LIMIT 1
@@ -318,23 +407,16 @@ async def optimize_user_resume(
             if not record:
                 raise HTTPException(status_code=404, detail="Resume not found")
 
-            # Get file from storage
-            file_data = supabase.storage.from_("careerpal").download(record["storage_path"])
-            file_like = io.BytesIO(file_data)
-            file = UploadFile(
-                filename=record["file_name"],
-                file=file_like,
-                headers={"content-type": "application/octet-stream"}
-            )
-        
-        # First extract the contact details directly
-        original_resume_data = await extract_resume_text(file)
-        
-        # Need to rewind the file after reading it
-        await file.seek(0)
+            original_resume_data = await load_parsed_resume(record)
+        else:
+            # First extract the contact details directly
+            original_resume_data = await extract_resume_text(file)
+
+        if "error" in original_resume_data:
+            raise HTTPException(status_code=500, detail=original_resume_data["error"])
         
-        # Get optimized resume
-        optimized_resume = await optimize_resume(file, job_description)
+        # Get optimized resume, reusing the extraction above instead of parsing twice
+        optimized_resume = await optimize_resume(file, job_description, resume_data=original_resume_data)
         
         if "error" in optimized_resume:
             raise HTTPException(status_code=500, detail=optimized_resume["error"])
@@ -421,6 +503,7 @@ async def delete_resume(
 
         # Delete from Supabase Storage
         storage_path = record["storage_path"]
+        await asyncio.to_thread(resume_cache.invalidate, storage_path)
         try:
             supabase.storage.from_("careerpal").remove([storage_path])
         except Exception as e:
@@ -528,8 +611,8 @@ async def create_tailored_resume(
         # Handle resume_id case - fetch from storage
         if resume_id:
             # Verify the resume exists in database
-            query = """
-                SELECT storage_path, file_name, user_id
+            query = f"""
+                SELECT {RESUME_RECORD_COLUMNS}
                 FROM resumes
                 WHERE id = :resume_id
                 LIMIT 1
@@ -542,29 +625,12 @@ async def create_tailored_resume(
             # If user_id wasn't provided, use the one from the database
             if not user_id:
                 user_id = record["user_id"]
-                
-            try:
-                # Download file from Supabase Storage
-                file_data = supabase.storage.from_("careerpal").download(record["storage_path"])
-                
-                # Create a temporary file-like object
-                file_like = BytesIO(file_data)
-                
-                # Create UploadFile with correct parameters
-                file = UploadFile(
-                    filename=record["file_name"],
-                    file=file_like,
-                    headers={"content-type": "application/octet-stream"}
-                )
-            except Exception as storage_error:
-                print(f"Storage Error: {str(storage_error)}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to fetch resume from storage: {str(storage_error)}"
-                )
-        
-        # Extract resume data (works with either uploaded file or file from storage)
-        resume_data = await extract_resume_text(file)
+
+            # Reuse parsed data from an earlier run on the same file
+            resume_data = await load_parsed_resume(record)
+        else:
+            # Extract resume data from the uploaded file
+            resume_data = await extract_resume_text(file)
         
         # Check for extraction errors
         if "error" in resume_data:
@@ -7,6 +7,8 @@ from app.services.users_services import (
     insert_user_service
 )
 import logging
+from app.responses import FastJSONResponse
+from typing import Optional
 
 
 # Initialize logger
@@ -16,14 +18,23 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 # Fetch paginated users
 @router.get("/")
-async def get_users(page: int = Query(1, alias="page"), limit: int = Query(10, alias="limit")):
-    return await fetch_users_from_db(page, limit)
+async def get_users(
+    page: int = Query(1, alias="page"),
+    limit: int = Query(10, alias="limit"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    include_total: bool = Query(True, description="Set to false to skip computing total_users"),
+    total_mode: str = Query("exact", pattern="^(exact|estimate)$", description="'estimate' uses the planner's row estimate"),
+):
+    # Returned as a response directly so rows skip jsonable_encoder
+    return FastJSONResponse(await fetch_users_from_db(
+        page, limit, cursor=cursor, include_total=include_total, total_mode=total_mode
+    ))
 
 
 # # Fetch user by ID
 @router.get("/{user_id}")
 async def get_user_by_id(user_id: str):
-    return await fetch_user_by_id(user_id)
+    return FastJSONResponse(await fetch_user_by_id(user_id))
 
 
 @router.get("/lookup/email")
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from databases import Database
+
+import database
+from app.services.cache import row_to_dict
+
+# A full crawl of a query is forced once this many seconds have passed since the last one
+SCRAPE_FULL_REFRESH_INTERVAL = float(os.getenv("SCRAPE_FULL_REFRESH_INTERVAL", str(7 * 86400)))
+# Incremental crawls stop after this many consecutive pages with no new jobs
+SCRAPE_STOP_AFTER_KNOWN_PAGES = int(os.getenv("SCRAPE_STOP_AFTER_KNOWN_PAGES", "3"))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+async def load_crawl_state(query: str, db: Optional[Database] = None) -> Optional[dict]:
+    row = await (db or database.database).fetch_one(
+        query="SELECT * FROM scrape_crawl_state WHERE query = :query",
+        values={"query": normalize_query(query)},
+    )
+    return row_to_dict(row) if row is not None else None
+
+
+def needs_full_crawl(state: Optional[dict]) -> bool:
+    """True when the query has never been fully crawled, or not within SCRAPE_FULL_REFRESH_INTERVAL."""
+    if not state or state.get("last_full_crawl_at") is None:
+        return True
+    age = (datetime.now(timezone.utc) - state["last_full_crawl_at"]).total_seconds()
+    return age > SCRAPE_FULL_REFRESH_INTERVAL
+
+
+async def save_crawl_state(
+    query: str,
+    full: bool,
+    pages_crawled: int,
+    jobs_saved: int,
+    newest_posting_date=None,
+    newest_link: Optional[str] = None,
+    db: Optional[Database] = None,
+):
+    """
+    Record a finished crawl. ``full`` should be True only when every page was
+    read, so that an interrupted full crawl is retried on the next run.
+    """
+    await (db or database.database).execute(
+        query="""
+            INSERT INTO scrape_crawl_state AS s
+                (query, last_crawled_at, last_full_crawl_at, newest_posting_date, newest_link, pages_crawled, jobs_saved)
+            VALUES (:query, NOW(), CASE WHEN :full THEN NOW() END, :newest_posting_date, :newest_link, :pages_crawled, :jobs_saved)
+            ON CONFLICT (query) DO UPDATE SET
+                last_crawled_at = EXCLUDED.last_crawled_at,
+                last_full_crawl_at = COALESCE(EXCLUDED.last_full_crawl_at, s.last_full_crawl_at),
+                newest_posting_date = GREATEST(EXCLUDED.newest_posting_date, s.newest_posting_date),
+                newest_link = CASE
+                    WHEN EXCLUDED.newest_posting_date >= COALESCE(s.newest_posting_date, EXCLUDED.newest_posting_date)
+                    THEN EXCLUDED.newest_link ELSE s.newest_link END,
+                pages_crawled = EXCLUDED.pages_crawled,
+                jobs_saved = EXCLUDED.jobs_saved
+        """,
+        values={
+            "query": normalize_query(query),
+            "full": full,
+            "newest_posting_date": newest_posting_date,
+            "newest_link": newest_link,
+            "pages_crawled": pages_crawled,
+            "jobs_saved": jobs_saved,
+        },
+    )
@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import os
+import random
+import re
+import uuid
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 64 permutations split into 16 bands of 4 rows: pairs above roughly 0.5 Jaccard
+# similarity share a band bucket with high probability, and candidates are then
+# confirmed against NEAR_DUPLICATE_THRESHOLD using the full signature.
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 20  # placeholder rows ("N/A", fetch errors) are too short to compare
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored, so the permutations must never change
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str) -> set:
+    """Hashed word n-grams of ``text``, case-insensitive."""
+    words = _WORD.findall(text.lower())
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode())
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 0))
+    }
+
+
+def minhash_signature(job: dict) -> Optional[List[int]]:
+    """
+    MinHash signature over a job's title, company and description, or None
+    when there is too little text to compare meaningfully.
+    """
+    text = " ".join(str(job.get(field) or "") for field in ("title", "company", "description"))
+    hashed = shingles(text)
+    if len(hashed) < MIN_SHINGLES:
+        return None
+    return [min((a * x + b) % _MERSENNE_PRIME for x in hashed) for a, b in _PERMUTATIONS]
+
+
+def lsh_buckets(signature: Sequence[int]) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs for a signature; buckets are signed 64-bit for a BIGINT column."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(repr(tuple(rows)).encode(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+async def _candidates(buckets: Iterable[Tuple[int, int]], db=None) -> Dict[Tuple[int, int], list]:
+    """Stored jobs sharing any of ``buckets``, as {(band, bucket): [(id, cluster id, signature)]}."""
+    from database import database
+
+    db = db or database
+    buckets = list(set(buckets))
+    index: Dict[Tuple[int, int], list] = {}
+    if not buckets:
+        return index
+    rows = await db.fetch_all(
+        query="""
+            SELECT b.band, b.bucket, j.id, j.duplicate_of, j.minhash
+            FROM job_lsh_bands b
+            JOIN jobs j ON j.id = b.job_id
+            WHERE (b.band, b.bucket) IN (
+                SELECT * FROM unnest(CAST(:bands AS smallint[]), CAST(:buckets AS bigint[]))
+            )
+        """,
+        values={"bands": [band for band, _ in buckets], "buckets": [bucket for _, bucket in buckets]},
+    )
+    for row in rows:
+        index.setdefault((row["band"], row["bucket"]), []).append(
+            (row["id"], row["duplicate_of"] or row["id"], list(row["minhash"]))
+        )
+    return index
+
+
+async def assign_duplicates(jobs: List[dict], index: Optional[dict] = None, db=None) -> List[dict]:
+    """
+    Give each job an id, its minhash and a duplicate_of pointing at the cluster
+    of its closest stored (or earlier in ``jobs``) near-duplicate, if any.
+    Passing the same ``index`` dict across calls also matches jobs from earlier
+    batches that may not be stored yet. ``db`` is the pool to query (primary by default).
+    Jobs are updated in place; returns the job_lsh_bands rows to save once
+    the jobs exist.
+    """
+    # About 5 ms of pure-Python hashing per job; kept off the event loop that serves the API
+    signatures = await asyncio.to_thread(lambda: [minhash_signature(job) for job in jobs])
+    buckets = [lsh_buckets(signature) if signature else [] for signature in signatures]
+    stored = await _candidates((bucket for job_buckets in buckets for bucket in job_buckets), db)
+    if index is None:
+        index = stored
+    else:
+        for key, candidates in stored.items():
+            present = {str(candidate[0]) for candidate in index.get(key, ())}
+            index.setdefault(key, []).extend(c for c in candidates if str(c[0]) not in present)
+
+    band_rows = []
+    for job, signature, job_buckets in zip(jobs, signatures, buckets):
+        job.setdefault("id", uuid.uuid4())
+        job["minhash"] = signature
+        job["duplicate_of"] = None
+        if signature is None:
+            continue
+
+        best = NEAR_DUPLICATE_THRESHOLD
+        for key in job_buckets:
+            for candidate_id, cluster_id, candidate in index.get(key, ()):
+                score = similarity(signature, candidate)
+                if score >= best and candidate_id != job["id"]:
+                    best, job["duplicate_of"] = score, cluster_id
+
+        # Later jobs in the same batch can match this one
+        for key in job_buckets:
+            index.setdefault(key, []).append((job["id"], job["duplicate_of"] or job["id"], signature))
+            band_rows.append({"band": key[0], "bucket": key[1], "job_id": job["id"]})
+    return band_rows
+
+
+def forget(index: dict, job_ids: set):
+    """
+    Remove jobs that were never stored (``job_ids`` as str) from an in-run index,
+    so no later job is pointed at them; jobs clustered under one of them
+    become their own cluster.
+    """
+    for key, candidates in index.items():
+        index[key] = [
+            (candidate_id, candidate_id if str(cluster_id) in job_ids else cluster_id, signature)
+            for candidate_id, cluster_id, signature in candidates
+            if str(candidate_id) not in job_ids
+        ]
+
+
+async def save_bands(band_rows: List[dict], job_ids: Optional[set] = None, db=None) -> int:
+    """Store LSH buckets, limited to ``job_ids`` (e.g. the jobs an insert actually wrote)."""
+    from database import bulk_insert
+
+    if job_ids is not None:
+        job_ids = {str(job_id) for job_id in job_ids}
+        band_rows = [row for row in band_rows if str(row["job_id"]) in job_ids]
+    return await bulk_insert(
+        "job_lsh_bands", band_rows, columns=["band", "bucket", "job_id"],
+        on_conflict="ignore", conflict_target=["band", "bucket", "job_id"], db=db,
+    )
+
+
+async def backfill_signatures(batch_size: int = 500) -> int:
+    """
+    Compute signatures and duplicate clusters for jobs stored before near-duplicate
+    detection existed, oldest first so the earliest posting becomes canonical.
+    Returns the number of jobs processed. Updated jobs are invalidated in
+    job_cache, which reaches the API workers only when CACHE_REDIS_URL is set;
+    otherwise a notice is printed.
+    """
+    from database import database, execute_many
+    from app.services.cache import row_to_dict
+    from app.services.job_service import job_cache
+
+    query = """
+        SELECT id, title, company, description FROM jobs
+        WHERE minhash IS NULL
+        ORDER BY created_at, id
+        LIMIT :limit
+    """
+    update = "UPDATE jobs SET minhash = :minhash, duplicate_of = :duplicate_of WHERE id = :id"
+    processed = 0
+
+    await database.connect()
+    try:
+        while True:
+            rows = await database.fetch_all(query=query, values={"limit": batch_size})
+            if not rows:
+                break
+            jobs = [row_to_dict(row) for row in rows]
+            band_rows = await assign_duplicates(jobs)
+            # Jobs too short to sign get an empty signature so they are not picked up again
+            await execute_many(query=update, values=[
+                {"id": job["id"], "minhash": job["minhash"] or [], "duplicate_of": job["duplicate_of"]}
+                for job in jobs
+            ])
+            await save_bands(band_rows)
+            await job_cache.invalidate(*[str(job["id"]) for job in jobs])
+            processed += len(jobs)
+            print(f"Computed signatures for {processed} jobs")
+    finally:
+        await database.disconnect()
+    notice = job_cache.invalidation_notice()
+    if processed and notice:
+        print(notice)
+    return processed
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_signatures())
@@ -0,0 +1,151 @@
+import asyncio
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.scraper.page_cache import OfflineCacheMiss, PageCache, page_cache
+
+# Define headers to mimic a browser request
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+}
+
+# Requests in flight at once, and the politeness limit per host (requests per second)
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+SCRAPER_RATE_PER_HOST = float(os.getenv("SCRAPER_RATE_PER_HOST", "5"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+SCRAPER_RETRIES = int(os.getenv("SCRAPER_RETRIES", "3"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    Spaces requests to each host at least 1/rate seconds apart.
+    Callers reserve a slot under the lock and sleep outside it, so waiting
+    on one host never delays another.
+    """
+
+    def __init__(self, rate: float = SCRAPER_RATE_PER_HOST):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class Fetcher:
+    """
+    Pooled keep-alive HTTP client for the scraper with a concurrency limit,
+    per-host rate limiting and retries with backoff on throttling and 5xx.
+    Pages go through ``cache`` (see PageCache) unless it is None.
+
+        async with Fetcher() as fetcher:
+            html = await fetcher.get(url)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = SCRAPER_CONCURRENCY,
+        rate: float = SCRAPER_RATE_PER_HOST,
+        retries: int = SCRAPER_RETRIES,
+        timeout: float = SCRAPER_TIMEOUT,
+        cache: Optional[PageCache] = page_cache,
+    ):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache
+        self.limiter = HostRateLimiter(rate)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.client: Optional[httpx.AsyncClient] = None
+        self.requests = 0
+        self.retried = 0
+        self.bytes = 0
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self.client = None
+
+    async def get(self, url: str, max_age: Optional[float] = None) -> str:
+        """
+        GET ``url`` and return the body text; raises httpx.HTTPError once retries are exhausted.
+        ``max_age`` overrides the cache TTL for pages without validators (0 always refetches them).
+        """
+        cached = await self.cache.lookup(url) if self.cache else None
+        if self.cache and self.cache.offline:
+            if cached is None:
+                raise OfflineCacheMiss(url)
+            self.cache.fresh_hits += 1
+            return cached["body"]
+        if cached and self.cache.is_fresh(cached, max_age):
+            self.cache.fresh_hits += 1
+            return cached["body"]
+
+        headers = PageCache.conditional_headers(cached)
+        host = urlsplit(url).netloc
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                await self.limiter.wait(host)
+                self.requests += 1
+                try:
+                    response = await self.client.get(url, headers=headers)
+                    if response.status_code == 304 and cached:
+                        self.cache.revalidated += 1
+                        await self.cache.store(url, cached["body"], cached.get("etag"), cached.get("last_modified"))
+                        return cached["body"]
+                    if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                        raise httpx.HTTPStatusError(
+                            f"Retryable status {response.status_code}", request=response.request, response=response
+                        )
+                    response.raise_for_status()
+                    self.bytes += len(response.content)
+                    if self.cache:
+                        await self.cache.store(
+                            url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                        )
+                    return response.text
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRY_STATUSES
+                    if not retryable or attempt == self.retries:
+                        raise
+                    self.retried += 1
+                    await asyncio.sleep(_retry_delay(e, attempt))
+
+    def stats(self) -> dict:
+        stats = {"requests": self.requests, "retried": self.retried, "bytes": self.bytes}
+        if self.cache:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honor Retry-After on 429/503, otherwise back off exponentially."""
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return 0.5 * 2 ** attempt
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from app.services.blob_cache import BlobCache
+
+# "on": cache and revalidate, "off": always fetch, "offline": serve only cached pages (replay)
+SCRAPER_CACHE_MODE = os.getenv("SCRAPER_CACHE_MODE", "on")
+# How long a page that came without ETag/Last-Modified is served without refetching
+SCRAPER_CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "86400"))
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode for a page that was never cached."""
+
+
+class PageCache:
+    """
+    Disk-backed cache of scraped pages on top of BlobCache.
+
+    Each entry keeps the body with its ETag/Last-Modified validators and fetch
+    time. Pages with validators are revalidated with a conditional request;
+    pages without are reused for ``ttl`` seconds. In offline mode cached pages
+    are replayed and nothing is fetched.
+
+    lookup and store are coroutines: BlobCache reads, writes and evicts on disk,
+    which runs in a worker thread so scrapes never block the API's event loop.
+    """
+
+    def __init__(self, blobs: BlobCache, mode: str = SCRAPER_CACHE_MODE, ttl: float = SCRAPER_CACHE_TTL):
+        self.blobs = blobs
+        self.mode = mode
+        self.ttl = ttl
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.stored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "offline"
+
+    async def lookup(self, url: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._read, url)
+
+    def _read(self, url: str) -> Optional[dict]:
+        data = self.blobs.get(url)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            self.blobs.invalidate(url)
+            return None
+
+    def is_fresh(self, entry: dict, max_age: Optional[float] = None) -> bool:
+        """Entries with validators are always revalidated; the rest expire after max_age (default ttl)."""
+        if entry.get("etag") or entry.get("last_modified"):
+            return False
+        max_age = self.ttl if max_age is None else max_age
+        return time.time() - entry["fetched_at"] < max_age
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    async def store(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+        entry = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        }
+        if self.enabled:
+            await asyncio.to_thread(self._write, url, entry)
+            self.stored += 1
+        return entry
+
+    def _write(self, url: str, entry: dict):
+        self.blobs.put(url, json.dumps(entry).encode("utf-8"))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "ttl": self.ttl,
+            "fresh_hits": self.fresh_hits,
+            "revalidated": self.revalidated,
+            "stored": self.stored,
+            **self.blobs.stats(),
+        }
+
+
+# Shared cache of search and detail pages
+page_cache = PageCache(
+    BlobCache(
+        directory=os.getenv("SCRAPER_CACHE_DIR", "/tmp/careerpal/scraper-cache"),
+        max_bytes=int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))),
+    )
+)
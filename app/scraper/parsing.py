@@ -0,0 +1,147 @@
+"""
+HTML parsing for findajob search and detail pages.
+
+The lxml backend parses in C and reads only the nodes the scraper needs with
+precompiled XPath queries. Without lxml, BeautifulSoup is used; search pages
+are then parsed through a SoupStrainer so only the result entries become a
+tree. Both backends return the same values as the original full
+BeautifulSoup parse.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional dependency
+    lxml = None
+
+SCRAPER_PARSER = os.getenv("SCRAPER_PARSER", "lxml" if lxml is not None else "html.parser")
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml is not None:
+    _TOTAL_HEADING = etree.XPath(f"(//h1[{_has_class('govuk-heading-l')}])[1]")
+    _RESULT_LINKS = etree.XPath(f"//div[{_has_class('search-result')}]")
+    _RESULT_TITLE_LINK = etree.XPath(f"(.//h3[{_has_class('govuk-heading-s')}])[1]")
+    _FIRST_LINK = etree.XPath("(.//a)[1]")
+    _DETAIL_TABLE = etree.XPath(f"(//table[{_has_class('govuk-table')}])[1]")
+    _TABLE_ROWS = etree.XPath(f".//tr[{_has_class('govuk-table__row')}]")
+    _ROW_HEADER = etree.XPath(f"(.//th[{_has_class('govuk-table__header')}])[1]")
+    _ROW_VALUE = etree.XPath(f"(.//td[{_has_class('govuk-table__cell')}])[1]")
+    _DESCRIPTION = etree.XPath("(//div[@itemprop='description'])[1]")
+    # Text nodes as BeautifulSoup's get_text sees them (no comments, scripts or styles)
+    _TEXT_NODES = etree.XPath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+
+
+def _text(element) -> str:
+    return "".join(_TEXT_NODES(element))
+
+
+def _first(matches):
+    return matches[0] if matches else None
+
+
+# --- lxml backend ---------------------------------------------------------
+
+def _lxml_total_jobs(html: str) -> Optional[str]:
+    heading = _first(_TOTAL_HEADING(lxml.html.fromstring(html)))
+    return _text(heading) if heading is not None else None
+
+
+def _lxml_search_results(html: str) -> List[Tuple[str, Optional[str]]]:
+    results = []
+    for job in _RESULT_LINKS(lxml.html.fromstring(html)):
+        heading = _first(_RESULT_TITLE_LINK(job))
+        title_tag = _first(_FIRST_LINK(heading)) if heading is not None else None
+        if title_tag is None:
+            continue
+        results.append((_text(title_tag).strip(), title_tag.get("href")))
+    return results
+
+
+def _lxml_job_fields(html: str) -> Tuple[Optional[str], Dict[str, str], Optional[str]]:
+    root = lxml.html.fromstring(html)
+    title = _first(_TOTAL_HEADING(root))
+
+    fields = {}
+    table = _first(_DETAIL_TABLE(root))
+    if table is not None:
+        for row in _TABLE_ROWS(table):
+            header = _first(_ROW_HEADER(row))
+            value = _first(_ROW_VALUE(row))
+            if header is not None and value is not None:
+                fields[_text(header).strip().rstrip(':').lower()] = _text(value).strip()
+
+    description = _first(_DESCRIPTION(root))
+    if description is not None:
+        description = "\n".join(text.strip() for text in _TEXT_NODES(description) if text.strip())
+    return (_text(title).strip() if title is not None else None), fields, description
+
+
+# --- BeautifulSoup backend --------------------------------------------------
+
+_SEARCH_STRAINER = SoupStrainer(["h1", "div"], class_=["govuk-heading-l", "search-result"])
+
+
+def _soup_total_jobs(html: str) -> Optional[str]:
+    heading = BeautifulSoup(html, SCRAPER_PARSER, parse_only=_SEARCH_STRAINER).find("h1", class_="govuk-heading-l")
+    return heading.text if heading else None
+
+
+def _soup_search_results(html: str) -> List[Tuple[str, Optional[str]]]:
+    soup = BeautifulSoup(html, SCRAPER_PARSER, parse_only=_SEARCH_STRAINER)
+    results = []
+    for job in soup.find_all("div", class_="search-result"):
+        heading = job.find("h3", class_="govuk-heading-s")
+        title_tag = heading.find("a") if heading else None
+        if not title_tag:
+            continue
+        results.append((title_tag.text.strip(), title_tag.get("href")))
+    return results
+
+
+def _soup_job_fields(html: str) -> Tuple[Optional[str], Dict[str, str], Optional[str]]:
+    soup = BeautifulSoup(html, SCRAPER_PARSER)
+    title = soup.find("h1", class_="govuk-heading-l")
+
+    fields = {}
+    table = soup.find("table", class_="govuk-table")
+    if table:
+        for row in table.find_all("tr", class_="govuk-table__row"):
+            header = row.find("th", class_="govuk-table__header")
+            value = row.find("td", class_="govuk-table__cell")
+            if header and value:
+                fields[header.text.strip().rstrip(':').lower()] = value.text.strip()
+
+    description = soup.find("div", itemprop="description")
+    description = description.get_text("\n", strip=True) if description else None
+    return (title.text.strip() if title else None), fields, description
+
+
+# --- public API -------------------------------------------------------------
+
+def parse_total_jobs(html: str) -> int:
+    """Job count from the "N jobs" heading of a search page."""
+    heading = _lxml_total_jobs(html) if SCRAPER_PARSER == "lxml" else _soup_total_jobs(html)
+    if heading is None:
+        raise ValueError("Search page has no result count heading")
+    return int(heading.split()[0].replace(',', ''))
+
+
+def parse_search_results(html: str) -> List[Tuple[str, Optional[str]]]:
+    """(title, href) of every listing on a search page, in page order."""
+    return _lxml_search_results(html) if SCRAPER_PARSER == "lxml" else _soup_search_results(html)
+
+
+def parse_job_fields(html: str) -> Tuple[Optional[str], Dict[str, str], Optional[str]]:
+    """
+    Title, the summary table as {lowercased header: value} and the description
+    (text lines joined by newlines) of a job details page; missing parts are None.
+    """
+    return _lxml_job_fields(html) if SCRAPER_PARSER == "lxml" else _soup_job_fields(html)
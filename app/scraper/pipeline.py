@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    """
+    One step of a Pipeline. ``workers`` tasks take items from a bounded inbox
+    and pass whatever ``handler`` returns (a list of items, or None) to the next
+    stage; a full inbox blocks the stage before it, which is the backpressure.
+    With ``batch_size`` the handler gets lists of up to that many items,
+    flushed early once ``batch_timeout`` seconds pass without a full batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Optional[Iterable]]],
+        workers: int = 1,
+        queue_size: int = 100,
+        batch_size: Optional[int] = None,
+        batch_timeout: float = 1.0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    async def _take(self) -> List[Any]:
+        items = [await self.inbox.get()]
+        if not self.batch_size:
+            return items
+        deadline = time.monotonic() + self.batch_timeout
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.inbox.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def work(self, downstream: Optional["Stage"]):
+        while True:
+            items = await self._take()
+            started = time.monotonic()
+            try:
+                results = await self.handler(items if self.batch_size else items[0])
+            except Exception as e:
+                self.errors += 1
+                results = None
+                logger.error(f"Pipeline stage {self.name} failed: {str(e)}")
+            self.busy_seconds += time.monotonic() - started
+            self.processed += len(items)
+            try:
+                for result in results or ():
+                    self.emitted += 1
+                    if downstream is not None:
+                        await downstream.inbox.put(result)
+            finally:
+                for _ in items:
+                    self.inbox.task_done()
+
+    def stats(self, elapsed: float) -> dict:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "queued": self.inbox.qsize(),
+            "busy_seconds": round(self.busy_seconds, 2),
+            "items_per_second": round(self.processed / elapsed, 2) if elapsed else None,
+            # Share of the stage's worker time spent handling items; the highest is the bottleneck
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else None,
+        }
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each with its own workers, so a slow
+    stage holds back only as much work as the queues in front of it allow.
+
+        await Pipeline([discover, fetch, parse, write]).run(page_numbers)
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._stopped = False
+
+    def stop(self):
+        """Stop feeding new items; items already queued are still processed."""
+        self._stopped = True
+
+    @property
+    def errors(self) -> int:
+        """Items dropped because a stage handler raised."""
+        return sum(stage.errors for stage in self.stages)
+
+    async def run(self, items: Iterable):
+        self.started = time.monotonic()
+        workers = []
+        for index, stage in enumerate(self.stages):
+            downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            workers.append([asyncio.create_task(stage.work(downstream)) for _ in range(stage.workers)])
+        try:
+            for item in items:
+                if self._stopped:
+                    break
+                await self.stages[0].inbox.put(item)
+            # Drain stage by stage: once a stage's inbox is done, nothing more can reach the next one
+            for stage, stage_workers in zip(self.stages, workers):
+                await stage.inbox.join()
+                for worker in stage_workers:
+                    worker.cancel()
+        finally:
+            for stage_workers in workers:
+                for worker in stage_workers:
+                    worker.cancel()
+            self.finished = time.monotonic()
+
+    def stats(self) -> dict:
+        if self.started is None:
+            return {}
+        elapsed = (self.finished or time.monotonic()) - self.started
+        stages = {stage.name: stage.stats(elapsed) for stage in self.stages}
+        busiest = max(stages, key=lambda name: stages[name]["utilization"] or 0)
+        return {"elapsed_seconds": round(elapsed, 2), "bottleneck": busiest, "stages": stages}
@@ -0,0 +1,162 @@
+import asyncio
+import re
+import sys
+from decimal import Decimal
+from typing import Dict, Optional
+
+CURRENCY_SYMBOLS = {"£": "GBP", "$": "USD", "€": "EUR"}
+
+# Multipliers used to annualize a rate (37.5 hour week, 5 day week)
+ANNUAL_MULTIPLIERS = {
+    "hour": Decimal("1950"),
+    "day": Decimal("260"),
+    "week": Decimal("52"),
+    "month": Decimal("12"),
+    "year": Decimal("1"),
+}
+
+PERIOD_PATTERNS = [
+    ("hour", re.compile(r"(per|an|a|/)\s*hour\b|hourly\b|p/?h\b", re.IGNORECASE)),
+    ("day", re.compile(r"(per|a|/)\s*day\b|daily\b", re.IGNORECASE)),
+    ("week", re.compile(r"(per|a|/)\s*week\b|weekly\b|p/?w\b", re.IGNORECASE)),
+    ("month", re.compile(r"(per|a|/)\s*month\b|monthly\b|pcm\b", re.IGNORECASE)),
+    ("year", re.compile(r"(per|a|/)\s*(year|annum)\b|annual(ly)?\b|p\.?a\b", re.IGNORECASE)),
+]
+
+# The period must be stated right after the amount ("£12 per hour", "£30k pa")
+PERIOD_WINDOW = 20
+
+_NUMBER = r"(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?"
+# A number that counts time ("35 hours", "2 days per week") is never pay
+_NOT_A_DURATION = r"(?!\s*(?:hours?|hrs?|days?|weeks?|months?|years?)\b)"
+# Only figures marked as money: a currency symbol, or a "k" suffix
+_MONEY = rf"(?:([£$€])\s?{_NUMBER}\s?([kK])?|{_NUMBER}\s?([kK]))\b{_NOT_A_DURATION}"
+# The upper bound may drop the symbol ("£25,000 to 30,000")
+_UPPER = rf"([£$€])?\s?{_NUMBER}\s?([kK])?\b{_NOT_A_DURATION}"
+SALARY_RANGE = re.compile(_MONEY + r"(?:\s*(?:to|-|–|—)\s*" + _UPPER + r")?")
+
+
+def _amount(digits: str, fraction: Optional[str], thousands: Optional[str]) -> Decimal:
+    value = Decimal(digits.replace(",", "") + (fraction or ""))
+    return value * 1000 if thousands else value
+
+
+def _infer_period(amount: Decimal) -> str:
+    """Guess the pay period of a bare figure from its magnitude."""
+    if amount < 100:
+        return "hour"
+    if amount < 1000:
+        return "day"
+    if amount < 10000:
+        return "month"
+    return "year"
+
+
+def _stated_period(text: str) -> Optional[str]:
+    """The period named at the start of ``text`` (the words after an amount), if any."""
+    window = text[:PERIOD_WINDOW].lstrip(" ,.")
+    for name, pattern in PERIOD_PATTERNS:
+        if pattern.match(window):
+            return name
+    return None
+
+
+def parse_salary(text: Optional[str], default_currency: str = "GBP") -> Dict[str, Optional[object]]:
+    """
+    Parse the Salary field of a job, such as "£25,000 to £30,000 per year",
+    into annualized numeric bounds.
+
+    Only amounts with a currency symbol or a "k" suffix count, so hours,
+    days and head counts in the text are never read as pay. The period is
+    taken from the words right after the amount, else inferred from its size.
+
+    Returns salary_min, salary_max (annual Decimals), salary_currency and
+    salary_period. Every value is None when no amount qualifies.
+    """
+    parsed = {"salary_min": None, "salary_max": None, "salary_currency": None, "salary_period": None}
+    if not text:
+        return parsed
+
+    match = SALARY_RANGE.search(text)
+    if not match:
+        return parsed
+
+    (symbol, digits, fraction, thousands, bare_digits, bare_fraction, bare_thousands,
+     symbol2, digits2, fraction2, thousands2) = match.groups()
+    if digits is None:
+        digits, fraction, thousands = bare_digits, bare_fraction, bare_thousands
+    low = _amount(digits, fraction, thousands)
+    high = _amount(digits2, fraction2, thousands2 or thousands) if digits2 else low
+    if low <= 0:
+        return parsed
+    if high < low:
+        # Not a range: e.g. stored text "£25,000 - £2,000 joining bonus" (Salary plus additional information)
+        high = low
+
+    period = _stated_period(text[match.end():]) or _infer_period(low)
+    multiplier = ANNUAL_MULTIPLIERS[period]
+    parsed.update({
+        "salary_min": (low * multiplier).quantize(Decimal("0.01")),
+        "salary_max": (high * multiplier).quantize(Decimal("0.01")),
+        "salary_currency": CURRENCY_SYMBOLS.get(symbol or symbol2, default_currency),
+        "salary_period": period,
+    })
+    return parsed
+
+
+async def backfill_salaries(batch_size: int = 1000, recompute: bool = False) -> int:
+    """
+    Parse the salary text of existing jobs into the numeric salary columns.
+    Walks the table by id so it can be re-run safely; returns rows updated.
+    ``recompute`` re-parses every job, clearing the columns where the current
+    parser finds no amount (python -m app.scraper.salary --recompute).
+    Updated jobs are invalidated in job_cache, which reaches the API workers
+    only when CACHE_REDIS_URL is set; otherwise a notice is printed.
+    """
+    from database import database, execute_many
+    from app.services.job_service import job_cache
+
+    query = """
+        SELECT id, salary FROM jobs
+        WHERE (salary_period IS NULL OR :recompute) AND salary IS NOT NULL AND id > :last_id
+        ORDER BY id
+        LIMIT :limit
+    """
+    update = """
+        UPDATE jobs
+        SET salary_min = :salary_min, salary_max = :salary_max,
+            salary_currency = :salary_currency, salary_period = :salary_period
+        WHERE id = :id
+    """
+    updated = 0
+    last_id = "00000000-0000-0000-0000-000000000000"
+
+    await database.connect()
+    try:
+        while True:
+            rows = await database.fetch_all(
+                query=query, values={"last_id": last_id, "limit": batch_size, "recompute": recompute}
+            )
+            if not rows:
+                break
+            values = []
+            for row in rows:
+                parsed = parse_salary(row["salary"])
+                if parsed["salary_period"] or recompute:
+                    values.append({"id": row["id"], **parsed})
+            if values:
+                await execute_many(query=update, values=values)
+                await job_cache.invalidate(*[str(value["id"]) for value in values])
+                updated += len(values)
+            last_id = rows[-1]["id"]
+            print(f"Backfilled salaries for {updated} jobs")
+    finally:
+        await database.disconnect()
+    notice = job_cache.invalidation_notice()
+    if updated and notice:
+        print(notice)
+    return updated
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_salaries(recompute="--recompute" in sys.argv))
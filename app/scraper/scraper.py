@@ -1,177 +1,435 @@
-from urllib.parse import quote
-import requests
-from bs4 import BeautifulSoup
-import datetime
+import itertools
+import os
 import time
+from contextlib import nullcontext
+from typing import Optional
+from urllib.parse import quote
 from databases import Database
-from server import database
+import database
 from datetime import datetime
+from app.scraper import parsing
+from app.scraper.salary import parse_salary
+from app.scraper.crawl_state import (
+    SCRAPE_STOP_AFTER_KNOWN_PAGES,
+    load_crawl_state,
+    needs_full_crawl,
+    save_crawl_state,
+)
+from app.scraper.dedup import assign_duplicates, forget, save_bands
+from app.scraper.fetcher import Fetcher
+from app.scraper.page_cache import OfflineCacheMiss
+from app.scraper.pipeline import Pipeline, Stage
+from app.services.facets_service import refresh_facets
+
+SCRAPER_BASE_URL = os.getenv("SCRAPER_BASE_URL", "https://findajob.dwp.gov.uk").rstrip("/")
+JOBS_PER_PAGE = 10
+# Search pages being worked on at once; keeps detail fetches for early pages
+# ahead of search-page downloads for late ones
+SCRAPER_PAGES_IN_FLIGHT = int(os.getenv("SCRAPER_PAGES_IN_FLIGHT", "4"))
+# Ingest pipeline sizing (see QueryIngest)
+SCRAPER_QUEUE_SIZE = int(os.getenv("SCRAPER_QUEUE_SIZE", "100"))
+SCRAPER_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "2"))
+SCRAPER_WRITE_WORKERS = int(os.getenv("SCRAPER_WRITE_WORKERS", "1"))
+SCRAPER_WRITE_BATCH_SIZE = int(os.getenv("SCRAPER_WRITE_BATCH_SIZE", "50"))
+SCRAPER_WRITE_BATCH_TIMEOUT = float(os.getenv("SCRAPER_WRITE_BATCH_TIMEOUT", "1.0"))
+
+# Columns written for each scraped job
+JOB_INSERT_COLUMNS = [
+    "title", "company", "location", "salary", "salary_min", "salary_max", "salary_currency",
+    "salary_period", "description", "posting_date", "closing_date", "hours", "job_type",
+    "remote_working", "link", "created_at", "id", "minhash", "duplicate_of",
+]
+
+
+class ScrapeProgress:
+    """Counters shared by the queries of one scrape run, read by the status endpoint."""
+
+    def __init__(self):
+        self.pages_done = 0
+        self.jobs_new = 0
+        self.jobs_skipped = 0
+        self.started = time.monotonic()
+        self.pipelines = {}  # query -> Pipeline, for per-stage metrics
+
+    def record_page(self, jobs_skipped: int):
+        self.pages_done += 1
+        self.jobs_skipped += jobs_skipped
+
+    def record_saved(self, jobs_new: int):
+        self.jobs_new += jobs_new
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "pages_done": self.pages_done,
+            "jobs_new": self.jobs_new,
+            "jobs_skipped": self.jobs_skipped,
+            "elapsed_seconds": round(elapsed, 1),
+            "pages_per_second": round(self.pages_done / elapsed, 2) if elapsed else None,
+            "jobs_per_second": round(self.jobs_new / elapsed, 2) if elapsed else None,
+            "pipelines": {query: pipeline.stats() for query, pipeline in self.pipelines.items()},
+        }
+
+
+def search_url(query: str, page: int) -> str:
+    # Newest first, so incremental runs meet new jobs on the first pages
+    return f"{SCRAPER_BASE_URL}/search?q={quote(query)}&sb=date&sd=down&p={page}"
+
+
+def parse_total_pages(html: str) -> int:
+    """Number of result pages from the "N jobs" heading of a search page."""
+    total_jobs = parsing.parse_total_jobs(html)
+    return (total_jobs + JOBS_PER_PAGE - 1) // JOBS_PER_PAGE  # Ceiling division
+
+
+def parse_search_results(html: str):
+    """(title, absolute link) for every listing on a search page."""
+    results = []
+    for title, job_href in parsing.parse_search_results(html):
+        if not job_href:
+            continue
+        job_link = job_href if job_href.startswith("https") else f"{SCRAPER_BASE_URL}{job_href}"
+        results.append((title, job_link))
+    return results
+
+
+async def known_links(links, db: Database) -> set:
+    """The subset of ``links`` already stored, live or archived, in one round trip."""
+    if not links:
+        return set()
+    rows = await db.fetch_all(
+        query="""
+            SELECT link FROM jobs WHERE link = ANY(:links)
+            UNION
+            SELECT link FROM jobs_archive WHERE link = ANY(:links)
+        """,
+        values={"links": list(links)},
+    )
+    return {row["link"] for row in rows}
+
+
+async def save_jobs(jobs, band_rows, db: Database, dropped: Optional[set] = None) -> int:
+    """
+    Insert new jobs and their LSH buckets; returns how many jobs were written.
+    ``dropped`` accumulates the ids (as str) of jobs that were not stored, across
+    batches, so that no stored duplicate_of is left pointing at one of them.
+    """
+    if not jobs:
+        return 0
+    dropped = set() if dropped is None else dropped
+
+    for job_details in jobs:
+        if job_details.get("duplicate_of") is not None and str(job_details["duplicate_of"]) in dropped:
+            job_details["duplicate_of"] = None
+        print(f"🆕 Found new job: {job_details['title']}")
+
+    # Insert the batch in one multi-row statement; a link saved
+    # concurrently since known_links() is skipped by the conflict clause
+    written = await database.bulk_insert(
+        "jobs", jobs, columns=JOB_INSERT_COLUMNS,
+        on_conflict="ignore", conflict_target=["link"], returning="id", db=db,
+    )
+    written_ids = {str(row["id"]) for row in written}
+    skipped = {str(job["id"]) for job in jobs} - written_ids
+    if skipped:
+        dropped.update(skipped)
+        # Jobs of this batch clustered under one whose insert was skipped
+        orphans = [
+            job["id"] for job in jobs
+            if str(job["id"]) in written_ids and str(job.get("duplicate_of")) in skipped
+        ]
+        if orphans:
+            await db.execute(
+                query="UPDATE jobs SET duplicate_of = NULL WHERE id = ANY(:ids)", values={"ids": orphans}
+            )
+    await save_bands(band_rows, written_ids, db)
+    # Only brand-new rows are written, so there is nothing cached to invalidate
+    database.mark_write("jobs")
+    print(f"Inserted {len(written)} new jobs")
+    return len(written)
+
+
+class QueryIngest:
+    """
+    The ingest pipeline for one query and its state:
+
+        search -> detail_fetch -> parse -> dedup -> write
+
+    search fetches result pages and drops links already stored; detail_fetch
+    downloads job pages; parse builds job rows; dedup batches rows and assigns
+    near-duplicate clusters; write inserts each batch. Stages are joined by
+    bounded queues, so memory stays flat on huge queries and a slow database
+    only slows fetching once the queues in front of it are full. All database
+    work goes through ``db``, the scrape's own pool.
+    """
+
+    def __init__(
+        self, query: str, full: bool, fetcher: Fetcher, db: Database, progress: Optional[ScrapeProgress] = None
+    ):
+        self.query = query
+        self.full = full
+        self.fetcher = fetcher
+        self.db = db
+        self.progress = progress
+        self.seen_links = set()
+        self.signatures = {}  # LSH index of this run's jobs, for batches not yet written
+        self.dropped = set()  # ids of this run's jobs that were not stored
+        self.pages_crawled = 0
+        self.consecutive_known = 0
+        self.stop_page = None
+        self._finished_pages = {}  # page -> True when it held no new jobs
+        self.jobs_saved = 0
+        self.jobs_known = 0
+        self.newest = None  # (posting_date, link) of the newest job saved
+        self.failed = False
+        self.pipeline = Pipeline([
+            Stage("search", self.discover, workers=SCRAPER_PAGES_IN_FLIGHT, queue_size=SCRAPER_PAGES_IN_FLIGHT),
+            Stage("detail_fetch", self.fetch_detail, workers=fetcher.concurrency, queue_size=SCRAPER_QUEUE_SIZE),
+            Stage("parse", self.parse, workers=SCRAPER_PARSE_WORKERS, queue_size=SCRAPER_QUEUE_SIZE),
+            Stage("dedup", self.dedup, queue_size=SCRAPER_QUEUE_SIZE,
+                  batch_size=SCRAPER_WRITE_BATCH_SIZE, batch_timeout=SCRAPER_WRITE_BATCH_TIMEOUT),
+            Stage("write", self.write, workers=SCRAPER_WRITE_WORKERS, queue_size=SCRAPER_WRITE_WORKERS * 2),
+        ])
+        if progress is not None:
+            progress.pipelines[query] = self.pipeline
 
-# Define headers to mimic a browser request
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Connection": "keep-alive",
-}
+    def _page_done(self, page: int, no_new_jobs: bool):
+        """Advance the in-order page count and stop incremental runs after enough known pages."""
+        self._finished_pages[page] = no_new_jobs
+        while self.pages_crawled + 1 in self._finished_pages:
+            self.pages_crawled += 1
+            known = self._finished_pages.pop(self.pages_crawled)
+            self.consecutive_known = self.consecutive_known + 1 if known else 0
+            if not self.full and self.stop_page is None and self.consecutive_known >= SCRAPE_STOP_AFTER_KNOWN_PAGES:
+                self.stop_page = self.pages_crawled
+                self.pipeline.stop()
+                print(f"Stopping after {self.consecutive_known} pages with no new jobs (page {self.stop_page})")
 
-async def scrape_and_save_jobs(query):
-    """Scrapes jobs from all available pages and saves them to the database."""
+    async def discover(self, item):
+        page, html = item
+        if self.stop_page is not None and page > self.stop_page:
+            return None
+        try:
+            if html is None:
+                url = search_url(self.query, page)
+                print(f" Scraping page {page}: {url}")
+                # Result lists change constantly; only revalidate, never reuse on TTL alone
+                html = await self.fetcher.get(url, max_age=0)
+            links = [job_link for _, job_link in parse_search_results(html)]
+            known = await known_links(links, self.db)
+        except Exception as e:
+            print(f"Error scraping page {page}: {str(e)}")
+            self.failed = True
+            self._page_done(page, False)
+            return None
+
+        new_links = [link for link in dict.fromkeys(links) if link not in known and link not in self.seen_links]
+        self.seen_links.update(new_links)
+        skipped = len(links) - len(new_links)
+        self.jobs_known += skipped
+        if self.progress is not None:
+            self.progress.record_page(skipped)
+        print(f" Found {len(links)} jobs on page {page}, {len(new_links)} new")
+        self._page_done(page, not new_links)
+        return new_links
+
+    async def fetch_detail(self, job_link):
+        try:
+            return [(job_link, await self.fetcher.get(job_link))]
+        except OfflineCacheMiss:
+            # Replaying cached pages: a page that was never recorded is skipped, not stored as a placeholder
+            return None
+        except Exception as e:
+            print(f" Error fetching job details from {job_link}: {str(e)}")
+            return [(job_link, None)]
+
+    async def parse(self, item):
+        job_link, html = item
+        if html is None:
+            return [placeholder_job(job_link)]
+        try:
+            return [parse_job_details(html, job_link)]
+        except Exception as e:
+            print(f" Error parsing job details from {job_link}: {str(e)}")
+            return [placeholder_job(job_link)]
+
+    async def dedup(self, jobs):
+        # Reposts and syndicated copies are kept but linked to their cluster
+        try:
+            band_rows = await assign_duplicates(jobs, index=self.signatures, db=self.db)
+        except Exception as e:
+            print(f"Error checking {len(jobs)} jobs for duplicates: {str(e)}")
+            self.failed = True
+            return None
+        return [(jobs, band_rows)]
+
+    async def write(self, batch):
+        jobs, band_rows = batch
+        job_ids = {str(job["id"]) for job in jobs}
+        try:
+            saved = await save_jobs(jobs, band_rows, self.db, self.dropped)
+        except Exception as e:
+            print(f"Error saving {len(jobs)} jobs: {str(e)}")
+            self.failed = True
+            self.dropped.update(job_ids)
+            forget(self.signatures, job_ids)
+            return None
+        if saved < len(jobs):
+            forget(self.signatures, job_ids & self.dropped)
+        self.jobs_saved += saved
+        if self.progress is not None:
+            self.progress.record_saved(saved)
+        for job in jobs:
+            if job["posting_date"] and (self.newest is None or job["posting_date"] > self.newest[0]):
+                self.newest = (job["posting_date"], job["link"])
+        return None
+
+
+async def scrape_and_save_jobs(
+    query,
+    full: Optional[bool] = None,
+    fetcher: Optional[Fetcher] = None,
+    progress: Optional[ScrapeProgress] = None,
+    db: Optional[Database] = None,
+):
+    """
+    Scrapes jobs from the search results for ``query`` and saves the new ones.
+
+    Pages stream through a QueryIngest pipeline: search pages and detail pages
+    are fetched concurrently through one pooled client, bounded by
+    SCRAPER_CONCURRENCY and SCRAPER_RATE_PER_HOST, and new jobs are written in
+    batches while later pages are still downloading.
+
+    Results are read newest first. An incremental run (``full=False``) stops
+    once SCRAPE_STOP_AFTER_KNOWN_PAGES consecutive pages hold no new jobs; a
+    full run reads every page. ``full=None`` runs a full crawl when the query's
+    last one is older than SCRAPE_FULL_REFRESH_INTERVAL.
+
+    Several queries can share one ``fetcher`` (and so its politeness limits),
+    one ``progress`` and one ``db``. ``db`` is a pool dedicated to scraping
+    (see database.scraper_database), so ingest never takes connections from the
+    API's pool; without one the scraper opens its own pool for the call.
+    Returns a summary of the run, including per-stage pipeline metrics.
+    """
+    ingest = None
+    failed = False
+    owns_pool = db is None
     try:
-        await database.connect()  # Use the database instance to connect
-        total_jobs_saved = 0
-        encoded_query = quote(query)  # URL encode the query parameter
-
-        # Determine the total number of pages
-        url = f"https://findajob.dwp.gov.uk/search?q={encoded_query}&p=1"
-        response = requests.get(url, headers=HEADERS)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract total number of jobs
-        total_jobs_text = soup.find("h1", class_="govuk-heading-l").text
-        total_jobs = int(total_jobs_text.split()[0].replace(',', ''))
-
-        jobs_per_page = 10
-        total_pages = (total_jobs + jobs_per_page - 1) // jobs_per_page  # Ceiling division
-
-        print(f"Total pages found: {total_pages}")
-
-        for page in range(1, total_pages + 1):
-            url = f"https://findajob.dwp.gov.uk/search?q={encoded_query}&p={page}"
-            print(f" Scraping page {page}: {url}")
-            
-            response = requests.get(url, headers=HEADERS)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            job_listings = soup.find_all("div", class_="search-result")
-
-            if not job_listings:
-                print(f"No jobs found on page {page}")
-                continue
+        if owns_pool:
+            db = database.scraper_database()
+            await db.connect()
+
+        if full is None:
+            full = needs_full_crawl(await load_crawl_state(query, db))
+        print(f"Starting {'full' if full else 'incremental'} scrape for '{query}'")
+
+        async with (Fetcher() if fetcher is None else nullcontext(fetcher)) as fetcher:
+            # Determine the total number of pages
+            first_page = await fetcher.get(search_url(query, 1), max_age=0)
+            total_pages = parse_total_pages(first_page)
+            print(f"Total pages found: {total_pages}")
+
+            ingest = QueryIngest(query, full, fetcher, db, progress)
+            pages = itertools.chain([(1, first_page)], ((page, None) for page in range(2, total_pages + 1)))
+            await ingest.pipeline.run(pages)
+            # Items a stage dropped on an unexpected error were never saved
+            if ingest.pipeline.errors:
+                ingest.failed = True
 
-            print(f" Found {len(job_listings)} jobs on page {page}")
-            
-            jobs = []
-            for job in job_listings:
-                try:
-                    title_tag = job.find("h3", class_="govuk-heading-s").find("a")
-                    if not title_tag:
-                        continue
-
-                    title = title_tag.text.strip()
-                    job_href = title_tag.get("href")
-                    job_link = job_href if job_href.startswith("https") else f"https://findajob.dwp.gov.uk{job_href}"
-
-                    #  Fetch full job details from the job details page
-                    job_details = fetch_job_details(job_link)
-
-                    # Check if job already exists
-                    existing_job_query = "SELECT COUNT(*) FROM jobs WHERE link = :link"
-                    existing_job_count = await database.fetch_val(
-                        query=existing_job_query, 
-                        values={"link": job_link}
-                    )
-
-                    if existing_job_count == 0:
-                        jobs.append(job_details)
-                        print(f"🆕 Found new job: {title}")
-
-                except Exception as e:
-                    print(f" Error processing job listing: {str(e)}")
-                    continue
-
-            # Insert jobs into database
-            if jobs:
-                query = """
-                INSERT INTO jobs (title, company, location, salary, description, posting_date, closing_date, hours, job_type, remote_working, link, created_at)
-                VALUES (:title, :company, :location, :salary, :description, :posting_date, :closing_date, :hours, :job_type, :remote_working, :link, :created_at)
-                ON CONFLICT (link) DO NOTHING
-                """
-                await database.execute_many(query=query, values=jobs)
-                total_jobs_saved += len(jobs)
-                print(f"Inserted {len(jobs)} new jobs from page {page}")
+            print(f"Fetched {fetcher.stats()}")
+            print(f"Pipeline {ingest.pipeline.stats()}")
+
+        await save_crawl_state(
+            query,
+            full=full and not ingest.failed and ingest.pages_crawled == total_pages,
+            pages_crawled=ingest.pages_crawled,
+            jobs_saved=ingest.jobs_saved,
+            newest_posting_date=ingest.newest[0] if ingest.newest else None,
+            newest_link=ingest.newest[1] if ingest.newest else None,
+            db=db,
+        )
+
+        # Fold the new jobs into the facet counts right away
+        if ingest.jobs_saved:
+            await refresh_facets(full=False, db=db)
 
     except Exception as e:
+        failed = True
         print(f"Error during scraping: {str(e)}")
     finally:
-        await database.disconnect()
-        print(f"Total jobs saved: {total_jobs_saved}")
+        if owns_pool and db.is_connected:
+            await db.disconnect()
+        if ingest is not None:
+            print(f"Total jobs saved: {ingest.jobs_saved}, already known: {ingest.jobs_known}")
 
-def fetch_job_details(job_url):
-    """Fetches full job details from the job details page with improved parsing."""
-    try:
-        response = requests.get(job_url, headers=HEADERS)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract title from h1
-        title = soup.find("h1", class_="govuk-heading-l")
-        title = title.text.strip() if title else "N/A"
-
-        # Initialize job details dictionary
-        job_details = {}
-
-        # Extract job details from the table more robustly
-        job_table = soup.find("table", class_="govuk-table")
-        if job_table:
-            rows = job_table.find_all("tr", class_="govuk-table__row")
-            for row in rows:
-                header = row.find("th", class_="govuk-table__header")
-                value = row.find("td", class_="govuk-table__cell")
-                
-                if header and value:
-                    key = header.text.strip().rstrip(':').lower()
-                    val = value.text.strip()
-                    job_details[key] = val
-
-        # Extract description
-        description_section = soup.find("div", itemprop="description")
-        description = description_section.get_text("\n", strip=True) if description_section else "No description available."
-
-        # Parse dates with better error handling
-        posting_date = convert_to_date(job_details.get('posting date', 'N/A'))
-        closing_date = convert_to_date(job_details.get('closing date', 'N/A'))
-
-        # Extract additional salary information if available
-        additional_salary = job_details.get('additional salary information', '')
-        salary = job_details.get('salary', 'N/A')
-        if additional_salary:
-            salary = f"{salary} - {additional_salary}"
-
-        # Construct and return the job data
-        return {
-            "title": title,
-            "company": job_details.get('company', 'N/A'),
-            "location": job_details.get('location', 'N/A'),
-            "salary": salary.strip(),
-            "description": description,
-            "posting_date": posting_date,
-            "closing_date": closing_date,
-            "hours": job_details.get('hours', 'N/A'),
-            "job_type": job_details.get('job type', 'N/A'),
-            "remote_working": job_details.get('remote working', 'N/A'),
-            "link": job_url,
-            "created_at": datetime.utcnow()
-        }
+    return {
+        "query": query,
+        "full": bool(full),
+        "pages_crawled": ingest.pages_crawled if ingest else 0,
+        "jobs_saved": ingest.jobs_saved if ingest else 0,
+        "jobs_known": ingest.jobs_known if ingest else 0,
+        "stopped_early": bool(ingest and ingest.stop_page is not None),
+        "failed": failed or bool(ingest and ingest.failed),
+        "pipeline": ingest.pipeline.stats() if ingest else {},
+    }
 
-    except Exception as e:
-        print(f" Error fetching job details from {job_url}: {str(e)}")
-        # Return default values if scraping fails
-        return {
-            "title": "N/A",
-            "company": "N/A",
-            "location": "N/A",
-            "salary": "N/A",
-            "description": "Error retrieving job description.",
-            "posting_date": None,
-            "closing_date": None,
-            "hours": "N/A",
-            "job_type": "N/A",
-            "remote_working": "N/A",
-            "link": job_url,
-            "created_at": datetime.utcnow()
-        }
+
+def placeholder_job(job_url):
+    """Row stored for a job whose details page could not be fetched or parsed."""
+    return {
+        "title": "N/A",
+        "company": "N/A",
+        "location": "N/A",
+        "salary": "N/A",
+        **parse_salary(None),
+        "description": "Error retrieving job description.",
+        "posting_date": None,
+        "closing_date": None,
+        "hours": "N/A",
+        "job_type": "N/A",
+        "remote_working": "N/A",
+        "link": job_url,
+        "created_at": datetime.utcnow()
+    }
+
+
+def parse_job_details(html, job_url):
+    """Builds the job row from a job details page."""
+    title, job_details, description = parsing.parse_job_fields(html)
+    if title is None:
+        title = "N/A"
+    if description is None:
+        description = "No description available."
+
+    # Parse dates with better error handling
+    posting_date = convert_to_date(job_details.get('posting date', 'N/A'))
+    closing_date = convert_to_date(job_details.get('closing date', 'N/A'))
+
+    # Extract additional salary information if available
+    additional_salary = job_details.get('additional salary information', '')
+    salary = job_details.get('salary', 'N/A')
+    # Numbers in the additional text are hours, days or head counts as often as pay
+    salary_columns = parse_salary(salary)
+    if additional_salary:
+        salary = f"{salary} - {additional_salary}"
+    salary = salary.strip()
+
+    # Construct and return the job data
+    return {
+        "title": title,
+        "company": job_details.get('company', 'N/A'),
+        "location": job_details.get('location', 'N/A'),
+        "salary": salary,
+        **salary_columns,
+        "description": description,
+        "posting_date": posting_date,
+        "closing_date": closing_date,
+        "hours": job_details.get('hours', 'N/A'),
+        "job_type": job_details.get('job type', 'N/A'),
+        "remote_working": job_details.get('remote working', 'N/A'),
+        "link": job_url,
+        "created_at": datetime.utcnow()
+    }
 
 def convert_to_date(date_str):
     """Converts various date formats to a datetime object with better error handling."""
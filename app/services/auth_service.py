@@ -13,6 +13,7 @@ load_dotenv()
 JWT_SECRET = os.getenv("JWT_SECRET")
 
 from database import database
+from app.services.users_services import fetch_user_by_email, invalidate_user
 
 # Initialize OAuth for Google authentication
 oauth = OAuth()
@@ -39,9 +40,8 @@ async def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 async def get_user_by_email(email: str):
-    """Retrieve user by email from the database"""
-    query = "SELECT * FROM users WHERE email = :email"
-    return await database.fetch_one(query=query, values={"email": email})
+    """Retrieve user by email; uncached, since login checks the password and account state"""
+    return await fetch_user_by_email(email)
 
 
 
@@ -58,6 +58,7 @@ async def register_user_with_password(email: str, full_name: str, password: str)
             query=query,
             values={"email": email, "full_name": full_name, "password_hash": hashed_password}
         )
+        await invalidate_user(new_user["id"], email)
         return new_user
 
     except asyncpg.UniqueViolationError:
@@ -79,6 +80,7 @@ async def register_user_with_google(email: str, full_name: str, google_id: str):
             query=query,
             values={"email": email, "full_name": full_name, "google_id": google_id}
         )
+        await invalidate_user(new_user["id"], email)
         return new_user
 
     except asyncpg.UniqueViolationError:
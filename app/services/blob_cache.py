@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BlobCache:
+    """
+    Size-capped, least-recently-used blob cache stored on local disk.
+
+    Each entry is a file named ``<key digest>.<content hash>`` so the cache
+    survives restarts and a stale copy can never be served for a key whose
+    content changed. Recency is tracked in memory and mirrored to file mtimes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key digest -> (content hash, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """Return the hex SHA-256 of a blob."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, key_digest: str, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{key_digest}.{content_hash}")
+
+    def _load(self):
+        """Rebuild the in-memory index from files left by a previous process."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            found = []
+            for name in os.listdir(self.directory):
+                key_digest, _, content_hash = name.partition(".")
+                if not content_hash or content_hash.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(self.directory, name))
+                found.append((stat.st_mtime, key_digest, content_hash, stat.st_size))
+            for _, key_digest, content_hash, size in sorted(found):
+                self._entries[key_digest] = (content_hash, size)
+                self._total_bytes += size
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Blob cache at {self.directory} unavailable: {str(e)}")
+
+    def _drop(self, key_digest: str):
+        content_hash, size = self._entries.pop(key_digest)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key_digest, content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+
+    def get(self, key: str, content_hash: Optional[str] = None) -> Optional[bytes]:
+        """
+        Return the cached blob for ``key`` or None on a miss.
+        When ``content_hash`` is given, an entry holding different content is discarded.
+        """
+        key_digest = self._digest(key)
+        with self._lock:
+            entry = self._entries.get(key_digest)
+            if entry is None or (content_hash and entry[0] != content_hash):
+                if entry is not None:
+                    self._drop(key_digest)
+                self.misses += 1
+                return None
+
+            path = self._path(key_digest, entry[0])
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._entries.pop(key_digest, None)
+                self._total_bytes -= entry[1]
+                self.misses += 1
+                return None
+
+            # Never hand out a truncated or corrupted file
+            if self.content_hash(data) != entry[0]:
+                self._drop(key_digest)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key_digest)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store a blob under ``key`` and return its content hash."""
+        key_digest = self._digest(key)
+        content_hash = self.content_hash(data)
+        if len(data) > self.max_bytes:
+            return content_hash
+
+        with self._lock:
+            if key_digest in self._entries:
+                self._drop(key_digest)
+            path = self._path(key_digest, content_hash)
+            tmp_path = f"{path}.tmp"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Failed to write blob cache entry: {str(e)}")
+                return content_hash
+
+            self._entries[key_digest] = (content_hash, len(data))
+            self._total_bytes += len(data)
+            self._evict()
+        return content_hash
+
+    def invalidate(self, key: str):
+        """Remove ``key`` from the cache if present."""
+        key_digest = self._digest(key)
+        with self._lock:
+            if key_digest in self._entries:
+                self._drop(key_digest)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Shared cache for resume files downloaded from Supabase Storage
+resume_cache = BlobCache(
+    directory=os.getenv("RESUME_CACHE_DIR", "/tmp/careerpal/resume-cache"),
+    max_bytes=int(os.getenv("RESUME_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+)
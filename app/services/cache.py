@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Hashable, Optional
+from uuid import UUID
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry and a size bound.
+    The least recently used entry is evicted once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def row_to_dict(row) -> dict:
+    """Copy a database record into a plain dict so it can be cached and shared."""
+    return dict(row._mapping) if hasattr(row, "_mapping") else dict(row)
+
+
+_shared_backend = None
+
+
+def shared_backend():
+    """
+    Redis client used by every worker when CACHE_REDIS_URL is set, else None.
+    redis is an optional dependency and is only imported when configured.
+    """
+    global _shared_backend
+    url = os.getenv("CACHE_REDIS_URL")
+    if url and _shared_backend is None:
+        import redis.asyncio as redis
+
+        _shared_backend = redis.from_url(url)
+    return _shared_backend
+
+
+# Column types restored when a row comes back from the shared cache, so callers get
+# the same values as from the local cache or the database instead of strings
+_DECODERS = {"datetime": datetime.fromisoformat, "date": date.fromisoformat, "uuid": UUID, "decimal": Decimal}
+
+
+def _column_type(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):  # before date: datetime is a date subclass
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    if isinstance(value, UUID):
+        return "uuid"
+    if isinstance(value, Decimal):
+        return "decimal"
+    return None
+
+
+def encode_row(row: dict) -> bytes:
+    """Serialize a row dict for the shared cache, recording which columns need decoding."""
+    types = {}
+    for key, value in row.items():
+        kind = _column_type(value)
+        if kind:
+            types[key] = kind
+    return orjson.dumps({"row": row, "types": types}, default=str)
+
+
+def decode_row(raw: bytes) -> dict:
+    """Inverse of encode_row."""
+    data = orjson.loads(raw)
+    row = data["row"]
+    for key, kind in data["types"].items():
+        if row.get(key) is not None:
+            row[key] = _DECODERS[kind](row[key])
+    return row
+
+
+class EntityCache:
+    """
+    Read-through cache for single rows (jobs, users) looked up by key.
+
+    Entries live in a process-local TTLCache, or in Redis when CACHE_REDIS_URL
+    is configured so that all workers see the same entries and invalidations.
+    Only hits are cached; a lookup that finds nothing always goes to the database.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 10000, ttl: float = 300.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"careerpal:{self.namespace}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[dict]:
+        backend = shared_backend()
+        if backend is None:
+            value = self.local.get(key)
+        else:
+            try:
+                raw = await backend.get(self._key(key))
+                value = decode_row(raw) if raw is not None else None
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Shared cache read failed for {self.namespace}: {str(e)}")
+                value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: dict):
+        backend = shared_backend()
+        if backend is None:
+            self.local.set(key, value)
+            return
+        try:
+            await backend.set(self._key(key), encode_row(value), ex=int(self.ttl))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Shared cache write failed for {self.namespace}: {str(e)}")
+
+    async def invalidate(self, *keys: Hashable):
+        for key in keys:
+            self.local.delete(key)
+        backend = shared_backend()
+        if backend is not None and keys:
+            try:
+                await backend.delete(*[self._key(key) for key in keys])
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Shared cache invalidation failed for {self.namespace}: {str(e)}")
+
+    def invalidation_notice(self) -> Optional[str]:
+        """
+        For scripts, which run in their own process: a warning that their
+        invalidations cannot reach the API workers' local caches, or None when
+        the entries live in Redis and the invalidation is shared.
+        """
+        if shared_backend() is not None:
+            return None
+        return (
+            f"CACHE_REDIS_URL is not set: running API workers keep serving their cached "
+            f"{self.namespace} entries for up to {self.ttl:.0f} seconds"
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis" if shared_backend() is not None else "local",
+            "size": self.local.stats()["size"],
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
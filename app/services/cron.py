@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import List, Set, Tuple
+
+# minute, hour, day of month, month, day of week (0 = Sunday)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        value_range, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if value_range == "*":
+            start, end = low, high
+        elif "-" in value_range:
+            start, end = (int(v) for v in value_range.split("-", 1))
+        else:
+            start = end = int(value_range)
+            if step > 1:
+                end = high
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def parse_cron(expression: str) -> Tuple[List[Set[int]], bool]:
+    """
+    Parse a five-field cron expression ("*/30 6-22 * * 1-5") or an alias such as
+    "@daily" into the allowed values of each field, plus whether a day matches
+    on either day field. Raises ValueError for anything else.
+    """
+    expression = ALIASES.get(expression.strip(), expression)
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError("Cron expressions need 5 fields: minute hour day month weekday")
+    try:
+        parsed = [_parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)]
+    except ValueError as e:
+        raise ValueError(f"Invalid cron expression '{expression}': {str(e)}")
+    # Vixie cron: when both day fields are restricted, either one may match
+    return parsed, fields[2] != "*" and fields[4] != "*"
+
+
+def next_run(expression: str, after: datetime) -> datetime:
+    """First time strictly after ``after`` (to the minute) that matches ``expression``."""
+    (minutes, hours, days, months, weekdays), either_day = parse_cron(expression)
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = moment + timedelta(days=5 * 366)
+
+    while moment < limit:
+        if moment.month not in months:
+            moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        day_match = moment.day in days
+        weekday_match = (moment.isoweekday() % 7) in weekdays
+        if not (day_match or weekday_match if either_day else day_match and weekday_match):
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if moment.hour not in hours:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+            continue
+        if moment.minute not in minutes:
+            moment += timedelta(minutes=1)
+            continue
+        return moment
+    raise ValueError(f"Cron expression '{expression}' never matches")
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from databases import Database
+from fastapi import HTTPException
+from database import database, read_database
+from app.services.cache import TTLCache
+from app.services.job_service import LIVE_JOBS_FILTER, build_job_filters
+
+logger = logging.getLogger(__name__)
+
+# Incremental refresh interval, and how often the whole aggregate is rebuilt
+FACETS_REFRESH_INTERVAL = float(os.getenv("FACETS_REFRESH_INTERVAL", "600"))
+FACETS_FULL_REFRESH_INTERVAL = float(os.getenv("FACETS_FULL_REFRESH_INTERVAL", "86400"))
+FACETS_LOCATION_LIMIT = 20
+FACETS_LOCK_ID = 7264320
+
+# Days already aggregated are re-read this far back to pick up rows that committed late
+HIGH_WATER_MARGIN = "INTERVAL '1 hour'"
+
+# Filters the aggregate table can answer; anything else is counted on jobs directly
+AGGREGATE_FILTERS = {"job_type", "remote", "location", "date_posted"}
+
+DATE_BUCKETS = "(VALUES ('Past 24 hours', 1), ('Past week', 7), ('Past month', 30), ('Any time', CAST(NULL AS integer)))"
+DATE_POSTED_DAYS = {"Past 24 hours": 1, "Past week": 7, "Past month": 30}
+
+FACET_COLUMNS = (
+    "COALESCE(job_type, '') AS job_type, COALESCE(remote_working, '') AS remote_working,"
+    " COALESCE(location, '') AS location"
+)
+
+facets_cache = TTLCache(maxsize=1024, ttl=60)
+
+
+async def refresh_facets(full: Optional[bool] = None, db: Optional[Database] = None) -> bool:
+    """
+    Bring job_facet_counts up to date.
+
+    Incremental runs re-aggregate only the days that received jobs since the last
+    refresh; a full run rebuilds the table (needed after jobs are removed).
+    ``full=None`` picks a full run once FACETS_FULL_REFRESH_INTERVAL has passed.
+    Returns False when another worker is already refreshing. ``db`` is the
+    pool to run on (e.g. a scrape run's), the primary by default.
+    """
+    db = db or database
+    async with db.transaction():
+        locked = await db.fetch_val(
+            query="SELECT pg_try_advisory_xact_lock(:lock_id)", values={"lock_id": FACETS_LOCK_ID}
+        )
+        if not locked:
+            return False
+
+        state = await db.fetch_one(query="SELECT high_water, last_full_refresh FROM job_facet_refresh")
+        if full is None:
+            last_full = state["last_full_refresh"] if state else None
+            full = (
+                last_full is None
+                or (datetime.now(timezone.utc) - last_full).total_seconds() > FACETS_FULL_REFRESH_INTERVAL
+            )
+        if not full and (not state or state["high_water"] is None):
+            full = True
+
+        if full:
+            await db.execute(query="DELETE FROM job_facet_counts")
+            day_filter, params = "", {}
+        else:
+            # Re-aggregate every day from the first to the last one touched since the
+            # last refresh; plain range bounds on created_at keep both steps on its index
+            days = await db.fetch_one(
+                query="SELECT MIN(created_at)::date AS day_start, MAX(created_at)::date + 1 AS day_end"
+                      f" FROM jobs WHERE created_at > :high_water - {HIGH_WATER_MARGIN}",
+                values={"high_water": state["high_water"]},
+            )
+            day_filter = " WHERE created_at >= CAST(:day_start AS date) AND created_at < CAST(:day_end AS date)"
+            params = {"day_start": days["day_start"], "day_end": days["day_end"]}
+            if days["day_start"] is not None:
+                await db.execute(
+                    query="DELETE FROM job_facet_counts WHERE posted_day >= :day_start AND posted_day < :day_end",
+                    values=params,
+                )
+
+        if full or params["day_start"] is not None:
+            await db.execute(
+                query=f"""
+                    INSERT INTO job_facet_counts (posted_day, job_type, remote_working, location, jobs)
+                    SELECT created_at::date, COALESCE(job_type, ''), COALESCE(remote_working, ''),
+                           COALESCE(location, ''), COUNT(*)
+                    FROM jobs{day_filter}
+                    GROUP BY 1, 2, 3, 4
+                """,
+                values=params,
+            )
+        await db.execute(
+            query="""
+                UPDATE job_facet_refresh
+                SET high_water = COALESCE((SELECT MAX(created_at) FROM jobs), high_water),
+                    last_full_refresh = CASE WHEN :full THEN NOW() ELSE last_full_refresh END
+            """,
+            values={"full": full},
+        )
+
+    facets_cache.clear()
+    logger.info(f"Refreshed job facets ({'full' if full else 'incremental'})")
+    return True
+
+
+async def facets_refresh_loop():
+    """Background task that keeps the facet aggregate fresh between scrapes."""
+    while True:
+        await asyncio.sleep(FACETS_REFRESH_INTERVAL)
+        try:
+            await refresh_facets()
+        except Exception as e:
+            logger.error(f"Facet refresh failed: {str(e)}")
+
+
+def _window_start_day(days: int) -> str:
+    return f"CAST(NOW() - INTERVAL '{days} days' AS date)"
+
+
+def _in_window(days: str) -> str:
+    """
+    Predicate over a facet source row for "created_at >= NOW() - ``days`` days",
+    the /jobs date_posted filter; ``days`` is a SQL expression, NULL for any time.
+
+    Rows are of three kinds. 'day' rows (the aggregate) count only for days that
+    lie wholly inside the window. 'edge' rows are single jobs on the day a window
+    starts, counted by exact created_at. 'exact' rows are single jobs from the
+    live source.
+    """
+    start = f"NOW() - make_interval(days => {days})"
+    return f"""CASE
+        WHEN {days} IS NULL THEN kind <> 'edge'
+        WHEN kind = 'day' THEN posted_day > CAST({start} AS date)
+        WHEN kind = 'edge' THEN posted_day = CAST({start} AS date) AND created_at >= {start}
+        ELSE created_at >= {start}
+    END"""
+
+
+def _aggregate_source(filters: Dict[str, Any]):
+    """
+    FROM-able source and bind values over job_facet_counts for the given filters.
+    Jobs are read directly for two corrections: closed jobs awaiting archival
+    are subtracted, as /jobs hides them, and the days the date windows start
+    on are added job by job (see in_window).
+    """
+    where = ""
+    params: Dict[str, Any] = {}
+    if filters.get("job_type"):
+        where += " AND job_type = :job_type"
+        params["job_type"] = filters["job_type"]
+    if filters.get("remote"):
+        where += " AND remote_working = :remote"
+        params["remote"] = filters["remote"]
+    if filters.get("location"):
+        where += " AND location ILIKE :location"
+        params["location"] = f"%{filters['location']}%"
+    edge_days = " OR ".join(
+        f"(created_at >= {_window_start_day(days)} AND created_at < {_window_start_day(days)} + 1)"
+        for days in DATE_POSTED_DAYS.values()
+    )
+    source = f"""
+        SELECT posted_day, job_type, remote_working, location, jobs,
+               CAST(NULL AS timestamptz) AS created_at, 'day' AS kind
+        FROM job_facet_counts WHERE 1=1{where}
+        UNION ALL
+        SELECT created_at::date, {FACET_COLUMNS}, -1, created_at, 'day'
+        FROM jobs
+        WHERE closing_date < CURRENT_DATE
+          AND created_at <= (SELECT high_water FROM job_facet_refresh){where}
+        UNION ALL
+        SELECT created_at::date, {FACET_COLUMNS}, 1, created_at, 'edge'
+        FROM jobs
+        WHERE ({edge_days}){LIVE_JOBS_FILTER}{where}
+    """
+    return source, params
+
+
+def _live_source(filters: Dict[str, Any]):
+    """Same shape as _aggregate_source but counted from jobs, for filters the aggregate lacks."""
+    where, params = build_job_filters(filters)
+    source = (
+        f"SELECT created_at::date AS posted_day, {FACET_COLUMNS}, 1 AS jobs, created_at, 'exact' AS kind"
+        f" FROM jobs WHERE 1=1{where}"
+    )
+    return source, params
+
+
+async def fetch_job_facets(filters: Optional[Dict[str, Any]] = None):
+    """
+    Counts per job_type, remote_working, location and date bucket for the current
+    filter set, computed in a single query over the pre-aggregated table whenever
+    the filters allow it. Counts match /jobs: closed jobs are left out and date
+    windows start at NOW() minus N days, not at midnight.
+    """
+    filters = {key: value for key, value in (filters or {}).items() if value not in (None, "", False)}
+    if filters.get("date_posted") == "Any time":
+        filters.pop("date_posted")
+
+    use_aggregate = set(filters) <= AGGREGATE_FILTERS
+    source, params = _aggregate_source(filters) if use_aggregate else _live_source(filters)
+    params["window_days"] = DATE_POSTED_DAYS.get(filters.get("date_posted") or "")
+    window_days = "CAST(:window_days AS integer)"
+
+    key = tuple(sorted(filters.items()))
+    cached = facets_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # A date bucket under a date_posted filter is the narrower of the two windows
+    query = f"""
+        WITH source AS ({source}),
+        filtered AS (SELECT * FROM source WHERE {_in_window(window_days)})
+        SELECT 'job_type' AS facet, job_type AS value, SUM(jobs) AS count
+        FROM filtered GROUP BY job_type HAVING SUM(jobs) > 0
+        UNION ALL
+        SELECT 'remote_working', remote_working, SUM(jobs)
+        FROM filtered GROUP BY remote_working HAVING SUM(jobs) > 0
+        UNION ALL
+        (SELECT 'location', location, SUM(jobs)
+         FROM filtered GROUP BY location HAVING SUM(jobs) > 0 ORDER BY 3 DESC LIMIT {FACETS_LOCATION_LIMIT})
+        UNION ALL
+        SELECT 'date_posted', buckets.label, SUM(source.jobs)
+        FROM source
+        JOIN {DATE_BUCKETS} AS buckets(label, days)
+          ON {_in_window(f"LEAST(buckets.days, {window_days})")}
+        GROUP BY buckets.label
+    """
+    try:
+        rows = await read_database("jobs").fetch_all(query=query, values=params)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    facets: Dict[str, list] = {"job_type": [], "remote_working": [], "location": [], "date_posted": []}
+    for row in rows:
+        facets[row["facet"]].append({"value": row["value"], "count": int(row["count"])})
+    for facet in ("job_type", "remote_working"):
+        facets[facet].sort(key=lambda item: item["count"], reverse=True)
+
+    result = {"facets": facets, "source": "aggregate" if use_aggregate else "live"}
+    facets_cache.set(key, result)
+    return result
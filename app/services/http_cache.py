@@ -0,0 +1,51 @@
+import hashlib
+from typing import Iterable
+
+from fastapi import Request, Response
+from app.responses import FastJSONResponse
+
+# Listings change whenever the scraper runs; details change rarely
+LIST_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=120"
+DETAIL_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=600"
+
+
+def compute_etag(*parts) -> str:
+    """
+    Weak ETag from the string form of ``parts``. Weak because GZipMiddleware
+    serves the same value gzipped or not, and a strong ETag must differ per encoding.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def rows_etag(rows: Iterable, *extra) -> str:
+    """
+    ETag for a list of job rows built from each row's id and updated_at only,
+    so it is cheap to compute and changes whenever any row on the page changes.
+    """
+    return compute_etag(*extra, *((row["id"], row["updated_at"]) for row in rows))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison, as RFC 9110 requires for If-None-Match: W/ prefixes are ignored
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def conditional_response(request: Request, etag: str, cache_control: str, content) -> Response:
+    """
+    Return 304 without serializing anything when the client already has ``etag``,
+    otherwise the JSON body with ETag and Cache-Control headers.
+    """
+    # Vary on every response, including identity ones, so shared caches key by encoding
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content=content, headers=headers)
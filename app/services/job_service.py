@@ -1,103 +1,291 @@
-from database import database
-from typing import Dict, Optional, Any
+import os
+from database import read_database
+from typing import Dict, List, Optional, Any, Tuple
 from fastapi import HTTPException
+from app.services.pagination import keyset_clause, next_cursor, fetch_total, page_count
+from app.services.cache import TTLCache, EntityCache, row_to_dict
 
-async def fetch_jobs_from_db(page: int, limit: int, filters: Optional[Dict[str, Any]] = None):
+# Columns returned for a job (excludes derived columns such as search_vector)
+JOB_COLUMNS = (
+    "id, title, company, location, salary, description, posting_date, closing_date, "
+    "hours, job_type, remote_working, link, created_at, updated_at, "
+    "salary_min, salary_max, salary_currency, salary_period, duplicate_of"
+)
+
+SELECTABLE_COLUMNS = [column.strip() for column in JOB_COLUMNS.split(",")]
+
+# Columns shown by list views; the description is replaced by a short snippet
+SUMMARY_COLUMNS = [
+    "id", "title", "company", "location", "salary", "salary_min", "salary_max",
+    "salary_currency", "salary_period", "job_type", "remote_working", "created_at", "updated_at",
+]
+SNIPPET_LENGTH = 200
+
+# Parsed once per query; websearch syntax accepts quotes, OR and -exclusions
+TS_QUERY = "websearch_to_tsquery('english', :q)"
+SNIPPET_OPTIONS = "MaxFragments=2, MaxWords=30, MinWords=10, StartSel=<mark>, StopSel=</mark>"
+SNIPPET = f"ts_headline('english', description, {TS_QUERY}, '{SNIPPET_OPTIONS}')"
+
+# Free-text columns matched by substring, or by trigram word similarity in fuzzy mode.
+# Both forms are served by the gin_trgm_ops indexes.
+TEXT_FILTER_COLUMNS = ("title", "company", "location")
+
+# Default listings show only open postings (see lifecycle_service for archival)
+LIVE_JOBS_FILTER = " AND (closing_date IS NULL OR closing_date >= CURRENT_DATE)"
+
+# Typeahead results change only when jobs are scraped, so a short TTL is plenty
+suggestion_cache = TTLCache(maxsize=4096, ttl=300)
+
+# Job detail rows by id; invalidated wherever a stored job changes (backfills, dedup, archival)
+job_cache = EntityCache(
+    "job",
+    maxsize=int(os.getenv("ENTITY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ENTITY_CACHE_TTL", "300")),
+)
+
+def build_job_filters(filters: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Translate /jobs filters into a WHERE fragment (appended to "WHERE 1=1") and its bind values.
+    """
+    where = ""
+    params: Dict[str, Any] = {}
+
+    # Closed postings are hidden until the next archival run moves them out of jobs
+    if not (filters and filters.get("include_closed")):
+        where += LIVE_JOBS_FILTER
+
+    if filters:
+        if "q" in filters and filters["q"]:
+            where += f" AND search_vector @@ {TS_QUERY}"
+            params["q"] = filters["q"]
+
+        for column in TEXT_FILTER_COLUMNS:
+            if column in filters and filters[column]:
+                params[column] = f"%{filters[column]}%"  # Case-insensitive partial match
+                if filters.get("fuzzy"):
+                    # "<%" tolerates typos ("Manchster") as well as partial words
+                    where += f" AND ({column} ILIKE :{column} OR :{column}_term <% {column})"
+                    params[f"{column}_term"] = filters[column]
+                else:
+                    where += f" AND {column} ILIKE :{column}"
+
+        if filters.get("collapse_duplicates"):
+            # One job per near-duplicate cluster (mostly served by idx_jobs_canonical_created_at).
+            # Duplicates of a canonical job that is closed or archived stand in for it.
+            canonical_live = "" if filters.get("include_closed") else (
+                " AND (c.closing_date IS NULL OR c.closing_date >= CURRENT_DATE)"
+            )
+            where += (
+                " AND (duplicate_of IS NULL OR NOT EXISTS ("
+                f"SELECT 1 FROM jobs c WHERE c.id = jobs.duplicate_of{canonical_live}))"
+            )
+
+        if "job_type" in filters and filters["job_type"]:
+            where += " AND job_type = :job_type"
+            params["job_type"] = filters["job_type"]
+
+        if "remote" in filters and filters["remote"]:
+            where += " AND remote_working = :remote"
+            params["remote"] = filters["remote"]
+
+        salary_min = filters.get("salary_min")
+        salary_max = filters.get("salary_max")
+        if salary_min is not None or salary_max is not None:
+            # Annual pay range must overlap the requested one; a missing bound is open-ended.
+            # Matches the expression of the partial GiST index idx_jobs_salary_range.
+            where += (
+                " AND salary_min IS NOT NULL"
+                " AND numrange(salary_min, salary_max, '[]')"
+                " && numrange(CAST(:salary_min AS numeric), CAST(:salary_max AS numeric), '[]')"
+            )
+            params["salary_min"] = salary_min
+            params["salary_max"] = salary_max
+
+        if "date_posted" in filters and filters["date_posted"] and filters["date_posted"] != "Any time":
+            if filters["date_posted"] == "Past 24 hours":
+                where += " AND created_at >= NOW() - INTERVAL '1 day'"
+            elif filters["date_posted"] == "Past week":
+                where += " AND created_at >= NOW() - INTERVAL '7 days'"
+            elif filters["date_posted"] == "Past month":
+                where += " AND created_at >= NOW() - INTERVAL '30 days'"
+
+    return where, params
+
+
+def job_projection(fields: Optional[str], view: Optional[str], full_text: bool) -> Tuple[List[str], Optional[str]]:
+    """
+    Resolve the ``fields``/``view`` options of /jobs into the columns to select and
+    the snippet expression to add (None when no snippet is wanted).
+    id, created_at and updated_at are always selected because pagination and ETags need them.
+    """
+    snippet = SNIPPET if full_text else f"LEFT(description, {SNIPPET_LENGTH})"
+
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in SELECTABLE_COLUMNS and field != "snippet"]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        columns = [c for c in SELECTABLE_COLUMNS if c in requested or c in ("id", "created_at", "updated_at")]
+        return columns, snippet if "snippet" in requested else None
+
+    if view == "summary":
+        return SUMMARY_COLUMNS, snippet
+
+    # Full rows; search results also carry the highlighted snippet
+    return SELECTABLE_COLUMNS, SNIPPET if full_text else None
+
+
+def rank_expression(sort: Optional[str], params: Dict[str, Any]) -> Optional[str]:
+    """
+    SQL expression to order a page by, or None for plain date order.
+    Defaults to relevance when a full-text query is present.
+    """
+    if sort is None:
+        sort = "relevance" if "q" in params else "recent"
+
+    if sort == "relevance" and "q" in params:
+        return f"ts_rank_cd(search_vector, {TS_QUERY})"
+
+    if sort == "similarity":
+        terms = [
+            f"word_similarity(:{column}_term, {column})"
+            for column in TEXT_FILTER_COLUMNS
+            if f"{column}_term" in params
+        ]
+        if terms:
+            return " + ".join(terms)
+
+    return None
+
+
+async def fetch_jobs_from_db(
+    page: int,
+    limit: int,
+    filters: Optional[Dict[str, Any]] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    total_mode: str = "exact",
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+):
     """
     Fetch jobs from the database with pagination and optional filtering.
+    When a cursor is given, the page is read by keyset instead of OFFSET.
+    A full-text query (filters["q"]) ranks results by relevance and adds a
+    highlighted snippet; sort="similarity" orders fuzzy matches by closeness.
+    With a cursor, results always stay in date order.
+    ``view="summary"`` or a ``fields`` list selects only those columns, with a
+    short snippet in place of the multi-kilobyte description.
+    Totals come from the count cache (or a planner estimate) and can be skipped.
     """
     try:
-        offset = (page - 1) * limit
-        query = "SELECT * FROM jobs WHERE 1=1"  # Ensure a valid WHERE clause
-        params: Dict[str, Any] = {"limit": limit, "offset": offset}
-
-        if filters:
-            if "title" in filters and filters["title"]:
-                query += " AND title ILIKE :title"
-                params["title"] = f"%{filters['title']}%"  # Case-insensitive partial match
-
-            if "job_type" in filters and filters["job_type"]:
-                query += " AND job_type = :job_type"
-                params["job_type"] = filters["job_type"]
-
-            if "location" in filters and filters["location"]:
-                query += " AND location ILIKE :location"
-                params["location"] = f"%{filters['location']}%"  # Case-insensitive search
-
-            if "remote" in filters and filters["remote"]:
-                query += " AND remote_working = :remote"
-                params["remote"] = filters["remote"]
-
-            if "salary_min" in filters and filters["salary_min"] is not None:
-                query += " AND salary >= :salary_min"
-                params["salary_min"] = str(filters["salary_min"])  # Convert to string
-
-            if "salary_max" in filters and filters["salary_max"] is not None:
-                query += " AND salary <= :salary_max"
-                params["salary_max"] = str(filters["salary_max"])  # Convert to string
-
-            if "date_posted" in filters and filters["date_posted"] and filters["date_posted"] != "Any time":
-                if filters["date_posted"] == "Past 24 hours":
-                    query += " AND created_at >= NOW() - INTERVAL '1 day'"
-                elif filters["date_posted"] == "Past week":
-                    query += " AND created_at >= NOW() - INTERVAL '7 days'"
-                elif filters["date_posted"] == "Past month":
-                    query += " AND created_at >= NOW() - INTERVAL '30 days'"
-
-        # Apply sorting, pagination
-        query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
-
-        jobs = await database.fetch_all(query=query, values=params)
-
-        # Count total jobs with filters
-        count_params = params.copy()
-        # Remove pagination parameters as they're not needed for the count
-        count_params.pop('limit', None)
-        count_params.pop('offset', None)
-
-        total_query = "SELECT COUNT(*) FROM jobs WHERE 1=1"
-        if filters:
-            # Only use the WHERE conditions, not the ORDER BY and LIMIT clauses
-            where_conditions = query.split("ORDER BY")[0].split("WHERE 1=1")[1]
-            total_query += where_conditions
-
-        total_jobs = await database.fetch_val(query=total_query, values=count_params)
+        where, filter_params = build_job_filters(filters)
+        params: Dict[str, Any] = {**filter_params, "limit": limit}
+        rank = None if cursor else rank_expression(sort, filter_params)
+        columns, snippet_expression = job_projection(fields, view, "q" in filter_params)
+        column_list = ", ".join(columns)
+        snippet = f", {snippet_expression} AS snippet" if snippet_expression else ""
+
+        if rank:
+            # Rank only matching rows, and build snippets only for the page being returned
+            params["offset"] = (page - 1) * limit
+            inner_columns = column_list if "description" in columns or not snippet else column_list + ", description"
+            query = f"""
+                SELECT {column_list}, rank{snippet}
+                FROM (
+                    SELECT {inner_columns}, {rank} AS rank
+                    FROM jobs WHERE 1=1{where}
+                    ORDER BY rank DESC, created_at DESC, id DESC
+                    LIMIT :limit OFFSET :offset
+                ) AS ranked
+                ORDER BY rank DESC, created_at DESC, id DESC
+            """
+        else:
+            query = f"SELECT {column_list}{snippet} FROM jobs WHERE 1=1" + where  # Ensure a valid WHERE clause
+
+            # Apply sorting, pagination (id breaks ties so keyset pages never skip rows)
+            if cursor:
+                query += keyset_clause(cursor, params)
+                query += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+            else:
+                query += " ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
+                params["offset"] = (page - 1) * limit
+
+        jobs = await read_database("jobs").fetch_all(query=query, values=params)
+
+        # The planner estimate covers the whole table; closed rows awaiting archival are within its error
+        count_where = "" if total_mode == "estimate" and where == LIVE_JOBS_FILTER else where
+        total_jobs = await fetch_total("jobs", count_where, filter_params, total_mode) if include_total else None
 
         return {
-            "page": page,
+            "page": None if cursor else page,
             "limit": limit,
             "total_jobs": total_jobs,
-            "total_pages": (total_jobs // limit) + (1 if total_jobs % limit else 0),
+            "total_pages": page_count(total_jobs, limit),
+            "next_cursor": None if rank else next_cursor(jobs, limit),
             "jobs": jobs
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-async def fetch_job_by_id(job_id: int):
+async def suggest_job_values(field: str, term: str, limit: int = 10):
     """
-    Fetch a single job by ID from the database.
+    Typeahead for title, company or location: distinct values that contain
+    or closely resemble ``term``, best matches first.
     """
-    try:
-        query = "SELECT * FROM jobs WHERE id = :job_id"
-        job = await database.fetch_one(query=query, values={"job_id": job_id})
+    if field not in TEXT_FILTER_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unsupported field: {field}")
 
-        if job:
-            return job
-        raise HTTPException(status_code=404, detail="Job not found")
+    key = (field, term.strip().lower(), limit)
+    suggestions = suggestion_cache.get(key)
+    if suggestions is not None:
+        return {"field": field, "term": term, "suggestions": suggestions}
+
+    try:
+        query = f"""
+            SELECT {field} AS value, COUNT(*) AS jobs, MAX(word_similarity(:term, {field})) AS score
+            FROM jobs
+            WHERE {field} ILIKE :pattern OR :term <% {field}
+            GROUP BY {field}
+            ORDER BY score DESC, jobs DESC
+            LIMIT :limit
+        """
+        rows = await read_database("jobs").fetch_all(
+            query=query, values={"term": term, "pattern": f"%{term}%", "limit": limit}
+        )
+        suggestions = [{"value": row["value"], "jobs": row["jobs"]} for row in rows]
+        suggestion_cache.set(key, suggestions)
+        return {"field": field, "term": term, "suggestions": suggestions}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-async def scrape_and_save_jobs_service(query: str):
+async def fetch_job_by_id(job_id: int):
     """
-    Scrape jobs from external sources and save them to the database.
+    Fetch a single job by ID, served from job_cache when possible.
+    Archived jobs are still found, with ``archived_at`` set.
     """
-    from app.scraper.scraper import scrape_and_save_jobs
-
     try:
-        await scrape_and_save_jobs(query)
-        return {"message": f"Jobs for '{query}' scraped and saved successfully."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Scraping error: {str(e)}")
+        job = await job_cache.get(str(job_id))
+        if job:
+            return job
+
+        query = f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = :job_id"
+        job = await read_database("jobs").fetch_one(query=query, values={"job_id": job_id})
+        if not job:
+            query = f"SELECT {JOB_COLUMNS}, archived_at FROM jobs_archive WHERE id = :job_id"
+            job = await read_database("jobs").fetch_one(query=query, values={"job_id": job_id})
 
+        if job:
+            job = row_to_dict(job)
+            await job_cache.set(str(job_id), job)
+            return job
+        raise HTTPException(status_code=404, detail="Job not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching job {job_id}: {str(e)}")
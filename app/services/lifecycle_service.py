@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import os
+
+from database import database
+from app.services.job_service import JOB_COLUMNS, SELECTABLE_COLUMNS, job_cache
+from app.services.pagination import count_cache
+
+logger = logging.getLogger(__name__)
+
+# Jobs older than this are archived even without a closing date
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "90"))
+JOB_ARCHIVE_INTERVAL = float(os.getenv("JOB_ARCHIVE_INTERVAL", "3600"))
+JOB_ARCHIVE_BATCH_SIZE = int(os.getenv("JOB_ARCHIVE_BATCH_SIZE", "1000"))
+ARCHIVE_LOCK_ID = 7264321
+
+# A job archived before (e.g. restored by hand) overwrites its old archive row;
+# DO NOTHING would drop the row, since it is already deleted from jobs
+ARCHIVE_UPSERT = ", ".join(
+    f"{column} = EXCLUDED.{column}" for column in SELECTABLE_COLUMNS if column != "id"
+)
+
+
+async def archive_expired_jobs(retention_days: int = JOB_RETENTION_DAYS, batch_size: int = JOB_ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move jobs past their closing_date, or older than ``retention_days``, from
+    jobs into jobs_archive in batches. Returns the number of jobs archived.
+    """
+    archived = 0
+    query = f"""
+        WITH moved AS (
+            DELETE FROM jobs
+            WHERE id IN (
+                SELECT id FROM jobs
+                WHERE closing_date < CURRENT_DATE
+                   OR created_at < NOW() - make_interval(days => :retention_days)
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {JOB_COLUMNS}
+        )
+        INSERT INTO jobs_archive ({JOB_COLUMNS})
+        SELECT {JOB_COLUMNS} FROM moved
+        ON CONFLICT (id) DO UPDATE SET {ARCHIVE_UPSERT}, archived_at = NOW()
+        RETURNING id
+    """
+    while True:
+        async with database.transaction():
+            locked = await database.fetch_val(
+                query="SELECT pg_try_advisory_xact_lock(:lock_id)", values={"lock_id": ARCHIVE_LOCK_ID}
+            )
+            if not locked:
+                break
+            rows = await database.fetch_all(
+                query=query, values={"retention_days": retention_days, "batch_size": batch_size}
+            )
+        if not rows:
+            break
+        await job_cache.invalidate(*[str(row["id"]) for row in rows])
+        archived += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if archived:
+        count_cache.clear()
+        # Removing rows is not visible to an incremental facet refresh
+        from app.services.facets_service import refresh_facets
+        await refresh_facets(full=True)
+        logger.info(f"Archived {archived} expired jobs")
+    return archived
+
+
+async def archive_loop():
+    """Background task that archives expired jobs every JOB_ARCHIVE_INTERVAL seconds."""
+    while True:
+        try:
+            await archive_expired_jobs()
+        except Exception as e:
+            logger.error(f"Job archival failed: {str(e)}")
+        await asyncio.sleep(JOB_ARCHIVE_INTERVAL)
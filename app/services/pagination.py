@@ -0,0 +1,88 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from database import read_database
+from app.services.cache import TTLCache
+
+# Totals for list endpoints, keyed by table and the normalized filter set
+count_cache = TTLCache(
+    maxsize=int(os.getenv("COUNT_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("COUNT_CACHE_TTL", "60")),
+)
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """
+    Build an opaque cursor pointing just past the row with this (created_at, id).
+    """
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor into (created_at, id).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_clause(cursor: Optional[str], params: dict) -> str:
+    """
+    Returns the WHERE fragment that continues a (created_at DESC, id DESC) scan
+    after the cursor, adding its bind values to params. Empty when no cursor is given.
+    """
+    if not cursor:
+        return ""
+    params["cursor_created_at"], params["cursor_id"] = decode_cursor(cursor)
+    return " AND (created_at, id) < (:cursor_created_at, :cursor_id)"
+
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """
+    Cursor for the page after ``rows``, or None when this was the last page.
+    """
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last["created_at"], last["id"])
+
+
+async def fetch_total(table: str, where: str = "", params: Optional[dict] = None, mode: str = "exact") -> int:
+    """
+    Returns the row count for a list query.
+    Exact totals are served from count_cache for COUNT_CACHE_TTL seconds.
+    In "estimate" mode an unfiltered total comes from the planner's row
+    estimate in pg_class instead of a full COUNT(*).
+    """
+    params = params or {}
+    if mode == "estimate" and not where:
+        estimate = await read_database(table).fetch_val(
+            query="SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)",
+            values={"table": table},
+        )
+        # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+        if estimate and estimate > 0:
+            return estimate
+
+    key = (table, where, tuple(sorted(params.items())))
+    total = count_cache.get(key)
+    if total is None:
+        total = await read_database(table).fetch_val(query=f"SELECT COUNT(*) FROM {table} WHERE 1=1{where}", values=params)
+        count_cache.set(key, total)
+    return total
+
+
+def page_count(total: Optional[int], limit: int) -> Optional[int]:
+    """Number of pages needed for ``total`` rows, or None when the total was skipped."""
+    if total is None:
+        return None
+    return (total // limit) + (1 if total % limit else 0)
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 import pycountry
 from difflib import SequenceMatcher
 from datetime import datetime
+from typing import Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -728,10 +729,11 @@ def score_resume(resume_data, job_description):
             "alternative_positions": ["Professional aligned with your skills", "Specialist in your field"]
         }
 
-async def optimize_resume(file: UploadFile, job_description: str):
+async def optimize_resume(file: UploadFile, job_description: str, resume_data: Optional[dict] = None):
     """Optimize resume to better match job description"""
-    # Extract resume text and structure
-    resume_data = await extract_resume_text(file)
+    # Extract resume text and structure unless the caller already has it
+    if resume_data is None:
+        resume_data = await extract_resume_text(file)
     
     if "error" in resume_data:
         return resume_data
@@ -0,0 +1,331 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from databases import Database
+from database import database, scraper_database
+from app.services.cache import row_to_dict
+from app.services.cron import next_run
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_SCHEDULER_INTERVAL = float(os.getenv("SCRAPE_SCHEDULER_INTERVAL", "60"))
+SCRAPE_HEARTBEAT_INTERVAL = float(os.getenv("SCRAPE_HEARTBEAT_INTERVAL", "5"))
+# Active runs whose heartbeat is older than this lost their worker and are marked failed
+SCRAPE_STALE_AFTER = float(os.getenv("SCRAPE_STALE_AFTER", "300"))
+SCRAPE_MAX_QUERIES_PER_RUN = int(os.getenv("SCRAPE_MAX_QUERIES_PER_RUN", "20"))
+SCHEDULER_LOCK_ID = 7264322
+
+RUN_COLUMNS = (
+    "id, queries, full_crawl, schedule_id, status, cancel_requested, pages_done, jobs_new, "
+    "jobs_skipped, error, created_at, started_at, finished_at, heartbeat_at"
+)
+SCHEDULE_COLUMNS = "id, name, queries, cron, full_crawl, enabled, last_run_at, next_run_at, created_at"
+
+# Runs executing in this process: run id -> (task, ScrapeProgress)
+_active_runs: Dict[str, tuple] = {}
+
+
+def _clean_queries(queries: List[str]) -> List[str]:
+    queries = list(dict.fromkeys(query.strip() for query in queries if query and query.strip()))
+    if not queries:
+        raise HTTPException(status_code=400, detail="At least one query is required")
+    if len(queries) > SCRAPE_MAX_QUERIES_PER_RUN:
+        raise HTTPException(status_code=400, detail=f"At most {SCRAPE_MAX_QUERIES_PER_RUN} queries per run")
+    return queries
+
+
+async def start_scrape_run(queries: List[str], full: Optional[bool] = None, schedule_id=None) -> dict:
+    """
+    Record a scrape run and start it in the background; returns the run row.
+    The queries of a run are scraped in parallel through one shared fetcher.
+    """
+    from app.scraper.scraper import ScrapeProgress
+
+    queries = _clean_queries(queries)
+    try:
+        row = await database.fetch_one(
+            query=f"""
+                INSERT INTO scrape_runs (queries, full_crawl, schedule_id, heartbeat_at)
+                VALUES (:queries, :full, :schedule_id, NOW())
+                RETURNING {RUN_COLUMNS}
+            """,
+            values={"queries": queries, "full": full, "schedule_id": schedule_id},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    run = row_to_dict(row)
+    run_id = str(run["id"])
+    progress = ScrapeProgress()
+    task = asyncio.create_task(_execute_run(run_id, queries, full, progress))
+    _active_runs[run_id] = (task, progress)
+    task.add_done_callback(lambda _: _active_runs.pop(run_id, None))
+    logger.info(f"Started scrape run {run_id} for {queries}")
+    return run
+
+
+async def _save_progress(
+    run_id: str, progress, db: Database, status: Optional[str] = None, error: Optional[str] = None
+):
+    """Write a run's counters (and final status) and return whether cancellation was requested."""
+    finish = ", status = :status, error = :error, finished_at = NOW()" if status else ""
+    values = {
+        "id": run_id,
+        "pages_done": progress.pages_done,
+        "jobs_new": progress.jobs_new,
+        "jobs_skipped": progress.jobs_skipped,
+    }
+    if status:
+        values.update(status=status, error=error)
+    return await db.fetch_val(
+        query=f"""
+            UPDATE scrape_runs
+            SET pages_done = :pages_done, jobs_new = :jobs_new, jobs_skipped = :jobs_skipped,
+                heartbeat_at = NOW(){finish}
+            WHERE id = :id
+            RETURNING cancel_requested
+        """,
+        values=values,
+    )
+
+
+async def _heartbeat(run_id: str, progress, db: Database, run_task: asyncio.Task):
+    """Persist progress periodically and stop the run when another worker asked to cancel it."""
+    while True:
+        await asyncio.sleep(SCRAPE_HEARTBEAT_INTERVAL)
+        try:
+            if await _save_progress(run_id, progress, db):
+                run_task.cancel()
+                return
+        except Exception as e:
+            logger.warning(f"Could not save progress of scrape run {run_id}: {str(e)}")
+
+
+async def _execute_run(run_id: str, queries: List[str], full: Optional[bool], progress):
+    """
+    Scrape every query of a run. The run has a connection pool of its own
+    (SCRAPER_POOL_SIZE connections) for ingest and heartbeats, so however many
+    queries it runs in parallel it never competes with API requests for theirs.
+    """
+    from app.scraper.fetcher import Fetcher
+    from app.scraper.scraper import scrape_and_save_jobs
+
+    status, error = "succeeded", None
+    heartbeat = None
+    db = scraper_database()
+    try:
+        await db.connect()
+        await db.execute(
+            query="UPDATE scrape_runs SET status = 'running', started_at = NOW(), heartbeat_at = NOW() WHERE id = :id",
+            values={"id": run_id},
+        )
+        heartbeat = asyncio.create_task(_heartbeat(run_id, progress, db, asyncio.current_task()))
+        async with Fetcher() as fetcher:
+            results = await asyncio.gather(*(
+                scrape_and_save_jobs(query, full=full, fetcher=fetcher, progress=progress, db=db)
+                for query in queries
+            ))
+        failed = [result["query"] for result in results if result["failed"]]
+        if failed:
+            status, error = "failed", f"Scraping failed for: {', '.join(failed)}"
+    except asyncio.CancelledError:
+        status = "cancelled"
+    except Exception as e:
+        status, error = "failed", str(e)
+        logger.error(f"Scrape run {run_id} failed: {str(e)}")
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        try:
+            # The app's pool records the outcome if the run's own pool never connected
+            await _save_progress(run_id, progress, db if db.is_connected else database, status=status, error=error)
+        except Exception as e:
+            logger.error(f"Could not record the end of scrape run {run_id}: {str(e)}")
+        if db.is_connected:
+            await db.disconnect()
+    logger.info(f"Scrape run {run_id} {status}: {progress.snapshot()}")
+
+
+def _with_rates(run: dict) -> dict:
+    """Add live progress (from this worker) or rates derived from the stored counters."""
+    active = _active_runs.get(str(run["id"]))
+    if active is not None:
+        run.update(active[1].snapshot())
+        return run
+    elapsed = None
+    if run.get("started_at"):
+        elapsed = ((run.get("finished_at") or datetime.now(timezone.utc)) - run["started_at"]).total_seconds()
+    run["elapsed_seconds"] = round(elapsed, 1) if elapsed is not None else None
+    run["pages_per_second"] = round(run["pages_done"] / elapsed, 2) if elapsed else None
+    run["jobs_per_second"] = round(run["jobs_new"] / elapsed, 2) if elapsed else None
+    return run
+
+
+async def get_scrape_run(run_id) -> dict:
+    """Status and progress of a scrape run."""
+    try:
+        row = await database.fetch_one(
+            query=f"SELECT {RUN_COLUMNS} FROM scrape_runs WHERE id = :id", values={"id": run_id}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not row:
+        raise HTTPException(status_code=404, detail="Scrape run not found")
+    return _with_rates(row_to_dict(row))
+
+
+async def list_scrape_runs(limit: int = 20) -> List[dict]:
+    try:
+        rows = await database.fetch_all(
+            query=f"SELECT {RUN_COLUMNS} FROM scrape_runs ORDER BY created_at DESC LIMIT :limit",
+            values={"limit": limit},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return [_with_rates(row_to_dict(row)) for row in rows]
+
+
+async def cancel_scrape_run(run_id) -> dict:
+    """
+    Ask a queued or running scrape run to stop. A run in this worker stops at
+    once; a run in another worker stops at its next heartbeat.
+    """
+    try:
+        cancelled = await database.fetch_val(
+            query="""
+                UPDATE scrape_runs SET cancel_requested = TRUE
+                WHERE id = :id AND status IN ('queued', 'running')
+                RETURNING id
+            """,
+            values={"id": run_id},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    run = await get_scrape_run(run_id)
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Scrape run already {run['status']}")
+    active = _active_runs.get(str(run_id))
+    if active is not None:
+        active[0].cancel()
+    return run
+
+
+async def create_scrape_schedule(name: str, queries: List[str], cron: str, full: Optional[bool] = None) -> dict:
+    """Add a recurring scrape of ``queries`` on a cron expression (evaluated in UTC)."""
+    queries = _clean_queries(queries)
+    try:
+        first_run = next_run(cron, datetime.now(timezone.utc))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        row = await database.fetch_one(
+            query=f"""
+                INSERT INTO scrape_schedules (name, queries, cron, full_crawl, next_run_at)
+                VALUES (:name, :queries, :cron, :full, :next_run_at)
+                RETURNING {SCHEDULE_COLUMNS}
+            """,
+            values={"name": name, "queries": queries, "cron": cron, "full": full, "next_run_at": first_run},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return row_to_dict(row)
+
+
+async def list_scrape_schedules() -> List[dict]:
+    try:
+        rows = await database.fetch_all(query=f"SELECT {SCHEDULE_COLUMNS} FROM scrape_schedules ORDER BY created_at")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return [row_to_dict(row) for row in rows]
+
+
+async def delete_scrape_schedule(schedule_id):
+    try:
+        deleted = await database.fetch_val(
+            query="DELETE FROM scrape_schedules WHERE id = :id RETURNING id", values={"id": schedule_id}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Scrape schedule not found")
+    return {"message": "Scrape schedule deleted"}
+
+
+async def run_due_schedules() -> int:
+    """
+    Start runs for every schedule that is due. The advisory lock makes sure only
+    one worker dispatches; a schedule whose previous run is still active skips
+    this slot. Returns the number of runs started.
+    """
+    async with database.transaction():
+        locked = await database.fetch_val(
+            query="SELECT pg_try_advisory_xact_lock(:lock_id)", values={"lock_id": SCHEDULER_LOCK_ID}
+        )
+        if not locked:
+            return 0
+        due = await database.fetch_all(query="""
+            SELECT s.id, s.queries, s.cron, s.full_crawl,
+                   EXISTS (
+                       SELECT 1 FROM scrape_runs r
+                       WHERE r.schedule_id = s.id AND r.status IN ('queued', 'running')
+                   ) AS busy
+            FROM scrape_schedules s
+            WHERE s.enabled AND s.next_run_at <= NOW()
+            FOR UPDATE OF s
+        """)
+        now = datetime.now(timezone.utc)
+        for schedule in due:
+            await database.execute(
+                query="UPDATE scrape_schedules SET last_run_at = NOW(), next_run_at = :next_run_at WHERE id = :id",
+                values={"id": schedule["id"], "next_run_at": next_run(schedule["cron"], now)},
+            )
+
+    started = 0
+    for schedule in due:
+        if schedule["busy"]:
+            logger.info(f"Skipping scrape schedule {schedule['id']}: previous run still active")
+            continue
+        await start_scrape_run(list(schedule["queries"]), schedule["full_crawl"], schedule_id=schedule["id"])
+        started += 1
+    return started
+
+
+async def fail_stale_runs() -> int:
+    """Mark runs whose worker stopped sending heartbeats as failed."""
+    rows = await database.fetch_all(
+        query="""
+            UPDATE scrape_runs
+            SET status = 'failed', error = 'Worker stopped before the run finished', finished_at = NOW()
+            WHERE status IN ('queued', 'running')
+              AND heartbeat_at < NOW() - make_interval(secs => :stale_after)
+            RETURNING id
+        """,
+        values={"stale_after": SCRAPE_STALE_AFTER},
+    )
+    return len(rows)
+
+
+async def scrape_scheduler_loop():
+    """Background task that starts scheduled scrapes and cleans up abandoned runs."""
+    while True:
+        try:
+            await fail_stale_runs()
+            await run_due_schedules()
+        except Exception as e:
+            logger.error(f"Scrape scheduler failed: {str(e)}")
+        await asyncio.sleep(SCRAPE_SCHEDULER_INTERVAL)
+
+
+async def stop_scrape_runs():
+    """Cancel the runs of this worker (on shutdown) and wait for them to record their status."""
+    tasks = [task for task, _ in _active_runs.values()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.wait(tasks, timeout=10)
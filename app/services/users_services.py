@@ -1,28 +1,103 @@
 from fastapi import HTTPException
-from database import database
+from database import database, mark_write, read_database
+import asyncpg
 import logging
+import os
+from typing import Optional
+from app.services.cache import EntityCache, row_to_dict
+from app.services.pagination import keyset_clause, next_cursor, fetch_total, page_count
 
 logger = logging.getLogger(__name__)
 
-async def fetch_users_from_db(page: int, limit: int):
+# User rows keyed by "id:<id>" and "email:<email>"
+user_cache = EntityCache(
+    "user",
+    maxsize=int(os.getenv("ENTITY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ENTITY_CACHE_TTL", "300")),
+)
+
+
+async def cache_user(user) -> dict:
+    """Store a user row under both its id and email keys and return it as a dict."""
+    user = row_to_dict(user)
+    await user_cache.set(f"id:{user['id']}", user)
+    if user.get("email"):
+        await user_cache.set(f"email:{user['email']}", user)
+    return user
+
+
+async def invalidate_user(user_id=None, email: Optional[str] = None):
+    """
+    Drop a user from the cache after it is inserted or updated, and keep
+    user reads on the primary until replicas have caught up with the write.
+    """
+    mark_write("users")
+    keys = []
+    if user_id is not None:
+        keys.append(f"id:{user_id}")
+    if email:
+        keys.append(f"email:{email}")
+    await user_cache.invalidate(*keys)
+
+
+async def get_cached_user_by_email(email: str):
+    """
+    Full user row for an email, from user_cache or a replica when possible; None
+    if no such user. For read-only lookups only; see fetch_user_by_email.
+    """
+    user = await user_cache.get(f"email:{email}")
+    if user:
+        return user
+    user = await read_database("users").fetch_one(query="SELECT * FROM users WHERE email = :email", values={"email": email})
+    return await cache_user(user) if user else None
+
+async def fetch_user_by_email(email: str):
+    """
+    Full user row for an email from the primary, never from user_cache or a
+    replica; None if no such user. Login reads password_hash and is_active here
+    so that a password change or deactivation takes effect immediately, and a
+    user registered through another worker is found despite replication lag.
+    Existence checks before inserting a user use it for the same reason.
+    """
+    user = await database.fetch_one(query="SELECT * FROM users WHERE email = :email", values={"email": email})
+    return row_to_dict(user) if user else None
+
+async def fetch_users_from_db(
+    page: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    total_mode: str = "exact",
+):
     """
     Fetch users from the database with pagination.
+    When a cursor is given, the page is read by keyset instead of OFFSET.
+    Totals come from the count cache (or a planner estimate) and can be skipped.
     """
     try:
-        offset = (page - 1) * limit
-        query = "SELECT * FROM users ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
-        users = await database.fetch_all(query=query, values={"limit": limit, "offset": offset})
-
-        total_query = "SELECT COUNT(*) FROM users"
-        total_users = await database.fetch_val(query=total_query)
+        params = {"limit": limit}
+        if cursor:
+            query = (
+                "SELECT * FROM users WHERE 1=1" + keyset_clause(cursor, params)
+                + " ORDER BY created_at DESC, id DESC LIMIT :limit"
+            )
+        else:
+            params["offset"] = (page - 1) * limit
+            query = "SELECT * FROM users ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
+        users = await read_database("users").fetch_all(query=query, values=params)
+
+        total_users = await fetch_total("users", mode=total_mode) if include_total else None
 
         return {
-            "page": page,
+            "page": None if cursor else page,
             "limit": limit,
             "total_users": total_users,
-            "total_pages": (total_users // limit) + (1 if total_users % limit else 0),
+            "total_pages": page_count(total_users, limit),
+            "next_cursor": next_cursor(users, limit),
             "users": users
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Database error while fetching users: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -33,12 +108,18 @@ async def fetch_user_by_id(user_id: str):
     Fetch a single user by ID from the database.
     """
     try:
+        user = await user_cache.get(f"id:{user_id}")
+        if user:
+            return user
+
         query = "SELECT * FROM users WHERE id = :user_id"
-        user = await database.fetch_one(query=query, values={"user_id": user_id})
+        user = await read_database("users").fetch_one(query=query, values={"user_id": user_id})
 
         if user:
-            return user
+            return await cache_user(user)
         raise HTTPException(status_code=404, detail="User not found")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching user {user_id}: {str(e)}")
@@ -51,10 +132,7 @@ async def fetch_user_id_by_email(email: str):
     try:
         logger.info(f" Running query for email: {email}")  
 
-        query = "SELECT id FROM users WHERE email = :email"  
-        values = {"email": email} 
-
-        result = await database.fetch_one(query=query, values=values)
+        result = await get_cached_user_by_email(email)
 
         if result:
             logger.info(f"Query executed successfully. User ID: {result['id']}")
@@ -76,8 +154,7 @@ async def insert_user_service(email: str, full_name: str, google_id: str):
     """
     try:
         # Check if user already exists
-        query = "SELECT id FROM users WHERE email = :email"
-        existing_user = await database.fetch_one(query, {"email": email})
+        existing_user = await fetch_user_by_email(email)
 
         if existing_user:
             return {"message": "User already exists", "user_id": existing_user["id"]}
@@ -88,7 +165,13 @@ async def insert_user_service(email: str, full_name: str, google_id: str):
         VALUES (:email, :full_name, :google_id) 
         RETURNING id
         """
-        new_user = await database.fetch_one(insert_query, {"email": email, "full_name": full_name, "google_id": google_id})
+        try:
+            new_user = await database.fetch_one(insert_query, {"email": email, "full_name": full_name, "google_id": google_id})
+        except asyncpg.UniqueViolationError:
+            # A concurrent registration of the same email won the race
+            existing_user = await fetch_user_by_email(email)
+            return {"message": "User already exists", "user_id": existing_user["id"]}
+        await invalidate_user(new_user["id"], email)
 
         return {"message": "User created successfully", "user_id": new_user["id"]}
     except Exception as e:
@@ -0,0 +1,83 @@
+"""
+Compare per-page parse cost of the original full BeautifulSoup("html.parser")
+trees with app/scraper/parsing.py, on the recorded pages in benchmarks/fixtures.
+Each backend's output is checked against the original before timing.
+
+    python benchmarks/bench_parsing.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.scraper import parsing  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def original_search_results(html: str):
+    """Search-page parsing as scrape_and_save_jobs did it before parsing.py."""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for job in soup.find_all("div", class_="search-result"):
+        title_tag = job.find("h3", class_="govuk-heading-s").find("a")
+        if title_tag:
+            results.append((title_tag.text.strip(), title_tag.get("href")))
+    return results
+
+
+def original_job_fields(html: str):
+    """Detail-page parsing as the scraper did it before parsing.py."""
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find("h1", class_="govuk-heading-l")
+    fields = {}
+    job_table = soup.find("table", class_="govuk-table")
+    if job_table:
+        for row in job_table.find_all("tr", class_="govuk-table__row"):
+            header = row.find("th", class_="govuk-table__header")
+            value = row.find("td", class_="govuk-table__cell")
+            if header and value:
+                fields[header.text.strip().rstrip(':').lower()] = value.text.strip()
+    description = soup.find("div", itemprop="description")
+    return (
+        title.text.strip() if title else None,
+        fields,
+        description.get_text("\n", strip=True) if description else None,
+    )
+
+
+def time_per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    search_html = (FIXTURES / "search_page.html").read_text()
+    detail_html = (FIXTURES / "job_details.html").read_text()
+
+    backends = ["html.parser"] + (["lxml"] if parsing.lxml is not None else [])
+    cases = [
+        ("search page", search_html, original_search_results, parsing.parse_search_results),
+        ("detail page", detail_html, original_job_fields, parsing.parse_job_fields),
+    ]
+    for label, html, original, fast in cases:
+        baseline = time_per_call(lambda: original(html), iterations)
+        line = f"{label:<12} original {baseline * 1000:7.3f} ms"
+        for backend in backends:
+            parsing.SCRAPER_PARSER = backend
+            if fast(html) != original(html):
+                raise SystemExit(f"{label}: {backend} output differs from the original parser")
+            elapsed = time_per_call(lambda: fast(html), iterations)
+            line += f" | {backend} {elapsed * 1000:7.3f} ms ({baseline / elapsed:4.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
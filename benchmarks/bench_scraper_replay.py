@@ -0,0 +1,325 @@
+"""
+End-to-end scraper benchmark that never touches findajob.dwp.gov.uk.
+
+A local HTTP stand-in serves a corpus of search and detail pages with
+configurable latency and error rate, and scrape_and_save_jobs runs against it
+and a local Postgres (migrated with migrate.py). Reports pages/s, jobs/s,
+HTTP requests, DB round trips and peak RSS, and can fail on thresholds
+so ingest regressions are caught before deploy. --trace-memory adds an
+untimed pass that reports peak Python allocations.
+
+    # synthetic corpus built from benchmarks/fixtures
+    python benchmarks/bench_scraper_replay.py --database-url postgresql://localhost/careerpal_bench
+
+    # record real pages once (needs network), then replay them
+    python benchmarks/bench_scraper_replay.py record --query "software engineer" --pages 20
+    python benchmarks/bench_scraper_replay.py --corpus benchmarks/corpus --latency-ms 80 --error-rate 0.02
+
+The database is taken from --database-url, BENCH_DATABASE_URL or
+SUPABASE_DATABASE_URL. Jobs previously scraped from the stand-in are deleted
+before each run, so it must not point at a production database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+LIVE_SITE = "https://findajob.dwp.gov.uk"
+JOBS_PER_PAGE = 10
+
+TITLES = ["Software Engineer", "Care Assistant", "Warehouse Operative", "Registered Nurse", "Data Analyst",
+          "HGV Class 1 Driver", "Customer Service Advisor", "Chef de Partie", "Electrician", "Teaching Assistant"]
+COMPANIES = ["Acme Digital Ltd", "Bright Care Homes", "Northern Logistics", "NHS Trust", "Insight Analytics",
+             "Road Freight UK", "Contact Centre Group", "The Riverside Kitchen", "Spark Electrical", "Oak Primary Academy"]
+WORDS = ("team customers quality shifts training pension holiday flexible support develop manage deliver "
+         "systems reports safety standards community patients clients vehicles stock orders projects").split()
+
+
+class SyntheticCorpus:
+    """
+    Search and detail pages generated from the fixture pages. Every tenth job
+    reposts an earlier one under a new link, so near-duplicate detection has
+    work to do.
+    """
+
+    def __init__(self, pages: int, seed: int = 1):
+        self.pages = pages
+        self.total_jobs = pages * JOBS_PER_PAGE
+        self.seed = seed
+        self.search_template = (FIXTURES / "search_page.html").read_text()
+        self.detail_template = (FIXTURES / "job_details.html").read_text()
+
+    def search_page(self, page: int):
+        if page < 1 or page > self.pages:
+            return None
+        ids = iter(range((page - 1) * JOBS_PER_PAGE, page * JOBS_PER_PAGE))
+        html = re.sub(r'href="/details/\d+"', lambda _: f'href="/details/{next(ids, 0)}"', self.search_template)
+        return html.replace("1,974 jobs found", f"{self.total_jobs:,} jobs found")
+
+    def detail_page(self, path: str):
+        match = re.fullmatch(r"/details/(\d+)", path)
+        if not match or int(match.group(1)) >= self.total_jobs:
+            return None
+        job_id = int(match.group(1))
+        source = job_id - 5 if job_id % 10 == 9 else job_id  # reposts
+        rng = random.Random(self.seed * 1_000_003 + source)
+        filler = " ".join(rng.choice(WORDS) for _ in range(120))
+        html = self.detail_template.replace("Software Engineer", TITLES[source % len(TITLES)])
+        html = html.replace("Acme Digital Ltd", COMPANIES[rng.randrange(len(COMPANIES))])
+        return html.replace('<div itemprop="description">', f'<div itemprop="description">\n<p>{filler}</p>', 1)
+
+
+class DirectoryCorpus:
+    """Pages recorded by the ``record`` command: manifest.json plus one file per page."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.manifest = json.loads((directory / "manifest.json").read_text())
+        self.pages = len(self.manifest["search"])
+        self.total_jobs = self.manifest["total_jobs"]
+
+    def _read(self, name):
+        return (self.directory / name).read_text() if name else None
+
+    def search_page(self, page: int):
+        return self._read(self.manifest["search"].get(str(page)))
+
+    def detail_page(self, path: str):
+        return self._read(self.manifest["details"].get(path))
+
+
+async def record(query: str, pages: int, directory: Path):
+    """Fetch ``pages`` result pages of ``query`` and their job pages from the live site into ``directory``."""
+    os.environ.setdefault("SCRAPER_CACHE_MODE", "off")
+    from urllib.parse import quote
+    from app.scraper.fetcher import Fetcher
+    from app.scraper.parsing import parse_search_results, parse_total_jobs
+
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {"query": query, "total_jobs": 0, "search": {}, "details": {}}
+    async with Fetcher() as fetcher:
+        for page in range(1, pages + 1):
+            # Same URL shape as app.scraper.scraper.search_url, without needing a database
+            html = await fetcher.get(f"{LIVE_SITE}/search?q={quote(query)}&sb=date&sd=down&p={page}")
+            if page == 1:
+                manifest["total_jobs"] = min(parse_total_jobs(html), pages * JOBS_PER_PAGE)
+            # Links must stay relative so replays are served by the stand-in
+            html = html.replace(f'href="{LIVE_SITE}/', 'href="/')
+            (directory / f"search-{page}.html").write_text(html)
+            manifest["search"][str(page)] = f"search-{page}.html"
+            for _, href in parse_search_results(html):
+                if not href or not href.startswith("/"):
+                    continue
+                name = "detail-" + re.sub(r"\W+", "-", href.strip("/")) + ".html"
+                (directory / name).write_text(await fetcher.get(LIVE_SITE + href))
+                manifest["details"][href] = name
+            print(f"Recorded page {page} ({len(manifest['details'])} job pages)")
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+
+def stand_in_app(corpus, latency_ms: float, jitter_ms: float, error_rate: float, stats: dict):
+    """Starlette app serving ``corpus`` like the live site, with injected latency and 503s."""
+    from starlette.applications import Starlette
+    from starlette.responses import HTMLResponse, Response
+    from starlette.routing import Route
+
+    rng = random.Random(7)
+
+    async def delay_or_fail():
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, rng.gauss(latency_ms, jitter_ms)) / 1000)
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return Response(status_code=503)
+        return None
+
+    async def search(request):
+        failure = await delay_or_fail()
+        if failure:
+            return failure
+        html = corpus.search_page(int(request.query_params.get("p", "1")))
+        return HTMLResponse(html) if html is not None else Response(status_code=404)
+
+    async def details(request):
+        failure = await delay_or_fail()
+        if failure:
+            return failure
+        html = corpus.detail_page(request.url.path)
+        return HTMLResponse(html) if html is not None else Response(status_code=404)
+
+    return Starlette(routes=[Route("/search", search), Route("/details/{job_id}", details)])
+
+
+class RoundTripCounter:
+    """Counts statements sent to Postgres by wrapping asyncpg's Connection methods."""
+
+    METHODS = ("execute", "executemany", "fetch", "fetchrow", "fetchval", "copy_records_to_table")
+
+    def __init__(self):
+        self.count = 0
+        self._originals = {}
+
+    def install(self):
+        import asyncpg
+
+        for name in self.METHODS:
+            original = getattr(asyncpg.Connection, name)
+            self._originals[name] = original
+
+            def counted(connection, *args, _original=original, **kwargs):
+                self.count += 1
+                return _original(connection, *args, **kwargs)
+
+            setattr(asyncpg.Connection, name, counted)
+
+    def uninstall(self):
+        import asyncpg
+
+        for name, original in self._originals.items():
+            setattr(asyncpg.Connection, name, original)
+
+
+async def reset_stand_in_state(query: str):
+    """Start from an empty slate for the stand-in's links (cascades to job_lsh_bands)."""
+    import database
+
+    for table in ("jobs", "jobs_archive"):
+        await database.database.execute(
+            query=f"DELETE FROM {table} WHERE link LIKE :prefix", values={"prefix": "http://127.0.0.1:%"}
+        )
+    await database.database.execute(query="DELETE FROM scrape_crawl_state WHERE query = :query",
+                                    values={"query": query})
+
+
+async def replay(args) -> int:
+    import uvicorn
+
+    corpus = DirectoryCorpus(Path(args.corpus)) if args.corpus else SyntheticCorpus(args.pages)
+    server_stats = {"requests": 0, "errors": 0}
+    config = uvicorn.Config(
+        stand_in_app(corpus, args.latency_ms, args.jitter_ms, args.error_rate, server_stats),
+        host="127.0.0.1", port=0, log_level="warning", lifespan="off",
+    )
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    # The scraper reads its settings at import time
+    os.environ["SCRAPER_BASE_URL"] = base_url
+    os.environ["SCRAPER_CACHE_MODE"] = "off"
+    os.environ["SCRAPER_RATE_PER_HOST"] = str(args.rate)
+    os.environ["SCRAPER_CONCURRENCY"] = str(args.concurrency)
+    os.environ["SCRAPER_RETRIES"] = "3"
+    import database
+    from migrate import migrate_up
+    from app.scraper.scraper import scrape_and_save_jobs
+
+    await database.connect()
+    try:
+        await migrate_up()
+        await reset_stand_in_state(args.query)
+
+        counter = RoundTripCounter()
+        counter.install()
+        started = time.perf_counter()
+        try:
+            summary = await scrape_and_save_jobs(args.query, full=True)
+        finally:
+            elapsed = time.perf_counter() - started
+            counter.uninstall()
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        http_stats = dict(server_stats)
+
+        # tracemalloc slows every allocation, so it gets a pass of its own that is never timed
+        peak_traced = None
+        if args.trace_memory:
+            await reset_stand_in_state(args.query)
+            tracemalloc.start()
+            try:
+                await scrape_and_save_jobs(args.query, full=True)
+            finally:
+                _, peak_traced = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+    finally:
+        await database.disconnect()
+        server.should_exit = True
+        await server_task
+
+    jobs = summary["jobs_saved"]
+    report = {
+        "corpus": args.corpus or f"synthetic ({args.pages} pages)",
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "elapsed_seconds": round(elapsed, 2),
+        "pages_crawled": summary["pages_crawled"],
+        "pages_per_second": round(summary["pages_crawled"] / elapsed, 2),
+        "jobs_saved": jobs,
+        "jobs_per_second": round(jobs / elapsed, 2),
+        "http_requests": http_stats["requests"],
+        "http_errors_injected": http_stats["errors"],
+        "db_round_trips": counter.count,
+        "db_round_trips_per_job": round(counter.count / jobs, 2) if jobs else None,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        "peak_python_memory_mb": round(peak_traced / 2 ** 20, 1) if peak_traced is not None else None,
+        "bottleneck": summary.get("pipeline", {}).get("bottleneck"),
+        "failed": summary["failed"],
+    }
+    for key, value in report.items():
+        print(f"{key:<24} {value}")
+
+    problems = []
+    if summary["failed"]:
+        problems.append("scrape reported failures")
+    if args.min_jobs_per_second and report["jobs_per_second"] < args.min_jobs_per_second:
+        problems.append(f"jobs/s {report['jobs_per_second']} < {args.min_jobs_per_second}")
+    if args.max_round_trips_per_job and (report["db_round_trips_per_job"] or 0) > args.max_round_trips_per_job:
+        problems.append(f"round trips/job {report['db_round_trips_per_job']} > {args.max_round_trips_per_job}")
+    for problem in problems:
+        print(f"REGRESSION  {problem}")
+    return 1 if problems else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["replay", "record"], default="replay")
+    parser.add_argument("--query", default="software engineer")
+    parser.add_argument("--pages", type=int, default=20, help="pages to synthesize or record")
+    parser.add_argument("--corpus", help="directory written by the record command (default: synthetic)")
+    parser.add_argument("--out", default=str(Path(__file__).resolve().parent / "corpus"), help="record target")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=15.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0, help="per-host requests/s (0 = unlimited)")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="add an untimed second pass that reports peak Python allocations (tracemalloc)")
+    parser.add_argument("--min-jobs-per-second", type=float, help="fail below this throughput")
+    parser.add_argument("--max-round-trips-per-job", type=float, help="fail above this many DB round trips per job")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["SUPABASE_DATABASE_URL"] = args.database_url
+    if args.command == "record":
+        asyncio.run(record(args.query, args.pages, Path(args.out)))
+        return 0
+    if not os.getenv("SUPABASE_DATABASE_URL"):
+        parser.error("a local Postgres is required: pass --database-url or set BENCH_DATABASE_URL")
+    return asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Compare per-page serialization cost of FastAPI's default path
+(jsonable_encoder + JSONResponse) with FastJSONResponse.
+
+    python benchmarks/bench_serialization.py [rows_per_page] [iterations]
+"""
+import sys
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.responses import FastJSONResponse  # noqa: E402
+
+
+def job_row(i: int, description_size: int) -> dict:
+    """A row shaped like SELECT {JOB_COLUMNS} FROM jobs."""
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid.uuid4(),
+        "title": f"Software Engineer {i}",
+        "company": "Example Ltd",
+        "location": "Manchester, Greater Manchester",
+        "salary": "£35,000 to £45,000 per year",
+        "description": ("Build and maintain services. " * (description_size // 29 + 1))[:description_size],
+        "posting_date": date(2025, 2, 10),
+        "closing_date": date(2025, 3, 10),
+        "hours": "Full time",
+        "job_type": "Permanent",
+        "remote_working": "Hybrid - work remotely up to 3 days per week",
+        "link": f"https://findajob.dwp.gov.uk/details/{i}",
+        "created_at": now,
+        "updated_at": now,
+        "salary_min": Decimal("35000.00"),
+        "salary_max": Decimal("45000.00"),
+        "salary_currency": "GBP",
+        "salary_period": "year",
+        "duplicate_of": None,
+    }
+
+
+def page(rows: int, description_size: int) -> dict:
+    return {
+        "page": 1,
+        "limit": rows,
+        "total_jobs": 12345,
+        "total_pages": 12345 // rows + 1,
+        "next_cursor": None,
+        "jobs": [job_row(i, description_size) for i in range(rows)],
+    }
+
+
+def time_per_call(fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for label, description_size in [("summary rows", 200), ("full rows", 4000)]:
+        content = page(rows, description_size)
+        default = time_per_call(lambda: JSONResponse(jsonable_encoder(content)).body, iterations)
+        fast = time_per_call(lambda: FastJSONResponse(content).body, iterations)
+        print(
+            f"{label:<13} {rows} rows/page: "
+            f"jsonable_encoder+JSONResponse {default * 1000:7.3f} ms | "
+            f"FastJSONResponse {fast * 1000:7.3f} ms | "
+            f"{default / fast:5.1f}x faster"
+        )
+
+
+if __name__ == "__main__":
+    main()
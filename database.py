@@ -1,5 +1,11 @@
 from databases import Database
+import asyncio
+import asyncpg
+import itertools
 import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Union
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,6 +17,46 @@ DATABASE_URL = os.getenv("SUPABASE_DATABASE_URL")
 # Create a new Database instance with statement_cache_size set to 0
 database = Database(DATABASE_URL, min_size=1, max_size=5, statement_cache_size=0)
 
+# Optional read replicas (comma-separated DSNs) for list and detail reads
+REPLICA_URLS = [url.strip() for url in os.getenv("SUPABASE_REPLICA_URLS", "").split(",") if url.strip()]
+replicas = [
+    Database(url, min_size=1, max_size=int(os.getenv("REPLICA_POOL_SIZE", "5")), statement_cache_size=0)
+    for url in REPLICA_URLS
+]
+_replica_cycle = itertools.cycle(replicas) if replicas else None
+
+# A replica whose read fails on a connection error leaves the rotation for this long
+REPLICA_RETRY_AFTER = float(os.getenv("REPLICA_RETRY_AFTER", "30"))
+_replica_down_until: Dict[Database, float] = {}
+
+# Errors that mean the replica itself is unreachable, as opposed to a bad query
+CONNECTION_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.exceptions.InterfaceError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.OperatorInterventionError,
+)
+
+# After a write to a topic (e.g. "users"), reads of that topic stay on the primary
+# for this long so that callers see their own writes despite replication lag.
+# Stickiness is per process: another worker does not know about the write, so
+# reads that must see it (uniqueness checks, login) go to ``database`` directly.
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+_last_write: Dict[str, float] = {}
+
+# Scrape runs use a pool of their own, so ingest never waits on API requests or starves them
+SCRAPER_POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "5"))
+
+# Rows per multi-row INSERT in bulk_insert
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "500"))
+
+# Postgres accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
+# ":name" placeholders, ignoring "::type" casts
+NAMED_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
 # Add connect and disconnect methods
 async def connect():
     """Connect to the database."""
@@ -30,6 +76,76 @@ async def disconnect():
         print(f"Error disconnecting from database: {str(e)}")
         raise e
 
+async def connect_replicas():
+    """Connect every configured replica; a replica that fails is skipped by read_database."""
+    for replica in replicas:
+        try:
+            await replica.connect()
+        except Exception as e:
+            print(f"Error connecting to replica {replica.url.hostname}: {str(e)}")
+
+async def disconnect_replicas():
+    for replica in replicas:
+        if replica.is_connected:
+            await replica.disconnect()
+
+def scraper_database() -> Database:
+    """A new pool on the primary for one scrape run; the caller connects and disconnects it."""
+    return Database(DATABASE_URL, min_size=1, max_size=SCRAPER_POOL_SIZE, statement_cache_size=0)
+
+def mark_write(*topics: str):
+    """Record a write so read_database keeps reads of these topics on the primary briefly."""
+    now = time.monotonic()
+    for topic in topics:
+        _last_write[topic] = now
+
+class ReplicaReader:
+    """
+    Read-only access to a replica that falls back to the primary: a read that
+    fails with a connection error is retried on ``database`` and the replica is
+    taken out of rotation for REPLICA_RETRY_AFTER seconds.
+    """
+
+    def __init__(self, replica: Database):
+        self.replica = replica
+
+    async def _read(self, method: str, query: str, values: Optional[dict]):
+        try:
+            return await getattr(self.replica, method)(query=query, values=values)
+        except CONNECTION_ERRORS as e:
+            _replica_down_until[self.replica] = time.monotonic() + REPLICA_RETRY_AFTER
+            print(f"Replica {self.replica.url.hostname} failed, reading from the primary: {str(e)}")
+            return await getattr(database, method)(query=query, values=values)
+
+    async def fetch_all(self, query: str, values: Optional[dict] = None):
+        return await self._read("fetch_all", query, values)
+
+    async def fetch_one(self, query: str, values: Optional[dict] = None):
+        return await self._read("fetch_one", query, values)
+
+    async def fetch_val(self, query: str, values: Optional[dict] = None):
+        return await self._read("fetch_val", query, values)
+
+def read_database(topic: Optional[str] = None) -> Union[Database, ReplicaReader]:
+    """
+    Database to use for a read-only query (fetch_all, fetch_one, fetch_val).
+    Round-robins over connected, healthy replicas, falling back to the primary
+    when no replica is available or ``topic`` was written within
+    REPLICA_STICKY_SECONDS by this process. Writes, transactions and reads that
+    must observe writes from other workers always use ``database`` (the primary)
+    directly.
+    """
+    if _replica_cycle is None:
+        return database
+    if topic and time.monotonic() - _last_write.get(topic, float("-inf")) < REPLICA_STICKY_SECONDS:
+        return database
+    now = time.monotonic()
+    for _ in range(len(replicas)):
+        replica = next(_replica_cycle)
+        if replica.is_connected and _replica_down_until.get(replica, 0) <= now:
+            return ReplicaReader(replica)
+    return database
+
 async def fetch_val(query: str, values: dict = None):
     """Execute a query and return a single value."""
     try:
@@ -39,13 +155,109 @@ async def fetch_val(query: str, values: dict = None):
         print(f"Error fetching value: {str(e)}")
         return 0
 
+def to_positional(query: str):
+    """Rewrite a query using :name placeholders to asyncpg's $n form, returning (query, names)."""
+    names: List[str] = []
+
+    def replace(match):
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    return NAMED_PARAM.sub(replace, query), names
+
+
 async def execute_many(query: str, values: list):
-    """Execute a query with multiple sets of values."""
+    """
+    Execute a query with multiple sets of values.
+    Uses asyncpg's executemany, which pipelines every set of values in one round trip.
+    """
+    if not values:
+        return
     try:
-        async with database.transaction():
-            for value in values:
-                await database.execute(query=query, values=value)
+        positional_query, names = to_positional(query)
+        args = [tuple(value[name] for name in names) for value in values]
+        async with database.connection() as connection:
+            async with connection.transaction():
+                await connection.raw_connection.executemany(positional_query, args)
         print(f"Successfully inserted {len(values)} records")
     except Exception as e:
         print(f"Error executing batch query: {str(e)}")
         raise e
+
+
+async def bulk_insert(
+    table: str,
+    rows: Sequence[dict],
+    columns: Optional[Sequence[str]] = None,
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+    on_conflict: Optional[str] = None,
+    conflict_target: Iterable[str] = (),
+    returning: Optional[str] = None,
+    use_copy: bool = False,
+    db: Optional[Database] = None,
+):
+    """
+    Insert many rows with one multi-row INSERT ... VALUES statement per batch.
+
+    on_conflict: None (raise), "ignore" (DO NOTHING) or "update" (overwrite
+    the non-key columns from EXCLUDED); conflict_target names the unique columns.
+    returning: optional RETURNING list; when given, the returned records are
+    collected and returned, otherwise the number of rows inserted is returned.
+    use_copy: stream rows with COPY instead; only valid without on_conflict/returning.
+    db: pool to write through (e.g. a scrape run's), the primary by default.
+    """
+    db = db or database
+    if not rows:
+        return [] if returning else 0
+
+    columns = list(columns or rows[0].keys())
+    conflict_target = list(conflict_target)
+    column_list = ", ".join(columns)
+
+    if use_copy:
+        if on_conflict or returning:
+            raise ValueError("COPY cannot handle on_conflict or returning")
+        async with db.connection() as connection:
+            await connection.raw_connection.copy_records_to_table(
+                table, records=[tuple(row.get(c) for c in columns) for row in rows], columns=columns
+            )
+        return len(rows)
+
+    conflict_clause = ""
+    if on_conflict:
+        target = f" ({', '.join(conflict_target)})" if conflict_target else ""
+        if on_conflict == "ignore":
+            conflict_clause = f" ON CONFLICT{target} DO NOTHING"
+        elif on_conflict == "update":
+            if not conflict_target:
+                raise ValueError("on_conflict='update' requires conflict_target")
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in conflict_target)
+            conflict_clause = f" ON CONFLICT{target} DO UPDATE SET {updates}"
+        else:
+            raise ValueError(f"Unknown on_conflict policy: {on_conflict}")
+    returning_clause = f" RETURNING {returning}" if returning else ""
+
+    batch_size = max(1, min(batch_size, MAX_BIND_PARAMS // len(columns)))
+    returned = []
+    inserted = 0
+
+    async with db.connection() as connection:
+        raw = connection.raw_connection
+        async with connection.transaction():
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                placeholders = ", ".join(
+                    "(" + ", ".join(f"${i * len(columns) + j + 1}" for j in range(len(columns))) + ")"
+                    for i in range(len(batch))
+                )
+                args = [row.get(c) for row in batch for c in columns]
+                query = f"INSERT INTO {table} ({column_list}) VALUES {placeholders}{conflict_clause}{returning_clause}"
+                if returning:
+                    returned.extend(await raw.fetch(query, *args))
+                else:
+                    status = await raw.execute(query, *args)  # e.g. "INSERT 0 42"
+                    inserted += int(status.split()[-1])
+
+    return returned if returning else inserted
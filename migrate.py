@@ -0,0 +1,175 @@
+"""
+Versioned schema migrations and query-plan checks.
+
+    python migrate.py up        # apply pending migrations/NNNN_*.sql in order
+    python migrate.py status    # list applied and pending migrations
+    python migrate.py check     # EXPLAIN the hot queries and report sequential scans
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from database import database
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# Arbitrary key for pg_advisory_lock so two deploys never migrate at once
+MIGRATION_LOCK_ID = 7264319
+
+SCHEMA_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+"""
+
+
+def discover_migrations():
+    """Return [(version, name, path)] for every migration file, ordered by version."""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        version, _, name = path.stem.partition("_")
+        migrations.append((version, name, path))
+    return migrations
+
+
+def checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+async def applied_migrations(raw) -> dict:
+    await raw.execute(SCHEMA_MIGRATIONS_TABLE)
+    rows = await raw.fetch("SELECT version, checksum FROM schema_migrations")
+    return {row["version"]: row["checksum"] for row in rows}
+
+
+async def migrate_up():
+    """Apply every pending migration, each in its own transaction."""
+    async with database.connection() as connection:
+        raw = connection.raw_connection
+        await raw.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+        try:
+            applied = await applied_migrations(raw)
+            pending = [m for m in discover_migrations() if m[0] not in applied]
+            if not pending:
+                print("Schema is up to date")
+            for version, name, path in pending:
+                print(f"Applying {path.name}")
+                async with raw.transaction():
+                    await raw.execute(path.read_text())
+                    await raw.execute(
+                        "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                        version, name, checksum(path),
+                    )
+        finally:
+            await raw.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+
+async def migration_status():
+    async with database.connection() as connection:
+        applied = await applied_migrations(connection.raw_connection)
+    for version, name, path in discover_migrations():
+        if version not in applied:
+            state = "pending"
+        elif applied[version] != checksum(path):
+            state = "applied (file changed since)"
+        else:
+            state = "applied"
+        print(f"{version}  {name:<40} {state}")
+
+
+def hot_queries():
+    """
+    The queries the API issues most, with representative parameters.
+    Built from the same helpers the services use so the plans match production SQL.
+    """
+    from app.services.job_service import JOB_COLUMNS, build_job_filters
+
+    queries = []
+    for label, filters in [
+        ("jobs: latest", {}),
+        ("jobs: job_type", {"job_type": "Full time"}),
+        ("jobs: job_type + remote", {"job_type": "Full time", "remote": "Remote"}),
+        ("jobs: location", {"location": "Manchester"}),
+        ("jobs: fuzzy location", {"location": "Manchster", "fuzzy": True}),
+        ("jobs: salary range", {"salary_min": 30000, "salary_max": 50000}),
+        ("jobs: collapsed duplicates", {"collapse_duplicates": True}),
+        ("jobs: full-text", {"q": "software engineer"}),
+    ]:
+        where, params = build_job_filters(filters)
+        queries.append((
+            label,
+            f"SELECT {JOB_COLUMNS} FROM jobs WHERE 1=1{where} ORDER BY created_at DESC, id DESC LIMIT 20",
+            params,
+        ))
+
+    queries += [
+        ("jobs: by id", f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = :job_id",
+         {"job_id": "00000000-0000-0000-0000-000000000000"}),
+        ("jobs: known links",
+         "SELECT link FROM jobs WHERE link = ANY(:links) UNION SELECT link FROM jobs_archive WHERE link = ANY(:links)",
+         {"links": ["https://example.com/1", "https://example.com/2"]}),
+        ("jobs_archive: by id", f"SELECT {JOB_COLUMNS}, archived_at FROM jobs_archive WHERE id = :job_id",
+         {"job_id": "00000000-0000-0000-0000-000000000000"}),
+        ("jobs: expired", "SELECT id FROM jobs WHERE closing_date < CURRENT_DATE LIMIT 1000", {}),
+        ("users: latest", "SELECT * FROM users ORDER BY created_at DESC, id DESC LIMIT 10", {}),
+        ("users: by email", "SELECT * FROM users WHERE email = :email", {"email": "someone@example.com"}),
+        ("resumes: by user",
+         "SELECT id, storage_path, file_name, uploaded_at, is_primary FROM resumes "
+         "WHERE user_id = :user_id ORDER BY uploaded_at DESC",
+         {"user_id": "00000000-0000-0000-0000-000000000000"}),
+    ]
+    return queries
+
+
+def sequential_scans(plan: dict):
+    """Yield (relation, estimated rows) for every Seq Scan node in an EXPLAIN JSON plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name"), plan.get("Plan Rows")
+    for child in plan.get("Plans", []):
+        yield from sequential_scans(child)
+
+
+async def check_plans() -> int:
+    """EXPLAIN each hot query and return how many of them plan a sequential scan."""
+    offenders = 0
+    for label, query, params in hot_queries():
+        result = await database.fetch_val(query=f"EXPLAIN (FORMAT JSON) {query}", values=params)
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]["Plan"]
+        scans = list(sequential_scans(plan))
+        if scans:
+            offenders += 1
+            detail = ", ".join(f"{relation} (~{rows} rows)" for relation, rows in scans)
+            print(f"SEQ SCAN  {label}: {detail}")
+        else:
+            print(f"ok        {label}: {plan['Node Type']}")
+    return offenders
+
+
+async def main(command: str) -> int:
+    await database.connect()
+    try:
+        if command == "up":
+            await migrate_up()
+        elif command == "status":
+            await migration_status()
+        elif command == "check":
+            offenders = await check_plans()
+            # Small tables legitimately plan seq scans; only fail when asked to
+            if offenders and os.getenv("MIGRATE_CHECK_STRICT"):
+                return 1
+        else:
+            print(__doc__)
+            return 2
+    finally:
+        await database.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "")))
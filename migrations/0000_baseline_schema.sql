@@ -0,0 +1,40 @@
+-- Baseline tables. Written with IF NOT EXISTS so it is a no-op on databases
+-- that were created before migrations were tracked.
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    email TEXT NOT NULL UNIQUE,
+    full_name TEXT,
+    password_hash TEXT,
+    google_id TEXT,
+    auth_provider TEXT,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    is_verified BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS resumes (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    storage_path TEXT NOT NULL,
+    file_name TEXT,
+    is_primary BOOLEAN NOT NULL DEFAULT FALSE,
+    uploaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    salary TEXT,
+    description TEXT,
+    posting_date DATE,
+    closing_date DATE,
+    hours TEXT,
+    job_type TEXT,
+    remote_working TEXT,
+    link TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
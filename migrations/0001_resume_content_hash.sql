@@ -0,0 +1,7 @@
+-- Fingerprint uploaded resumes so identical re-uploads reuse the stored
+-- object, the existing row and the parsed data.
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS parsed_data JSONB;
+
+CREATE INDEX IF NOT EXISTS idx_resumes_user_content_hash
+    ON resumes (user_id, content_hash);
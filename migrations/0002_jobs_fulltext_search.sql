@@ -0,0 +1,11 @@
+-- Full-text search over jobs. The generated column is kept in sync by
+-- Postgres on every insert/update, and adding it backfills existing rows.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_search_vector ON jobs USING GIN (search_vector);
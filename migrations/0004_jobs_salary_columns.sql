@@ -0,0 +1,11 @@
+-- Numeric, annualized salary bounds parsed from the free-text salary at ingest.
+-- Existing rows are filled in by: python -m app.scraper.salary
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS salary_min NUMERIC(12, 2);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS salary_max NUMERIC(12, 2);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS salary_currency CHAR(3);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS salary_period TEXT;
+
+-- Serves the /jobs salary filters, which test for overlap with the requested range
+CREATE INDEX IF NOT EXISTS idx_jobs_salary_range ON jobs
+    USING GIST (numrange(salary_min, salary_max, '[]'))
+    WHERE salary_min IS NOT NULL;
@@ -0,0 +1,45 @@
+-- Indexes for the access paths used by the API and the scraper.
+
+-- ON CONFLICT (link) in the scraper and email lookups need unique indexes.
+-- Older databases may already have them under another name, so only add when missing.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'jobs'::regclass AND i.indisunique AND i.indnatts = 1 AND a.attname = 'link'
+    ) THEN
+        CREATE UNIQUE INDEX idx_jobs_link ON jobs (link);
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'users'::regclass AND i.indisunique AND i.indnatts = 1 AND a.attname = 'email'
+    ) THEN
+        CREATE UNIQUE INDEX idx_users_email ON users (email);
+    END IF;
+END $$;
+
+-- /jobs default order and keyset pagination: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at_id ON jobs (created_at DESC, id DESC);
+
+-- Common /jobs filter combinations, each still ordered for pagination
+CREATE INDEX IF NOT EXISTS idx_jobs_job_type_created_at ON jobs (job_type, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_remote_created_at ON jobs (remote_working, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_job_type_remote_created_at
+    ON jobs (job_type, remote_working, created_at DESC, id DESC);
+
+-- Salary-filtered listings only ever look at rows with a parsed salary
+CREATE INDEX IF NOT EXISTS idx_jobs_salary_created_at ON jobs (created_at DESC, id DESC)
+    WHERE salary_min IS NOT NULL;
+
+-- /resume/get-resumes: WHERE user_id = ? ORDER BY uploaded_at DESC
+CREATE INDEX IF NOT EXISTS idx_resumes_user_uploaded_at ON resumes (user_id, uploaded_at DESC);
+
+-- /users ordering and keyset pagination
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON users (created_at DESC, id DESC);
+
+ANALYZE jobs;
+ANALYZE resumes;
+ANALYZE users;
@@ -0,0 +1,18 @@
+-- Pre-aggregated job counts per filter dimension and day, used by /jobs/facets.
+-- Maintained by app/services/facets_service.refresh_facets.
+CREATE TABLE IF NOT EXISTS job_facet_counts (
+    posted_day DATE NOT NULL,
+    job_type TEXT NOT NULL,
+    remote_working TEXT NOT NULL,
+    location TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (posted_day, job_type, remote_working, location)
+);
+
+-- Single-row bookkeeping: jobs created after high_water have not been aggregated yet
+CREATE TABLE IF NOT EXISTS job_facet_refresh (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    high_water TIMESTAMPTZ,
+    last_full_refresh TIMESTAMPTZ
+);
+INSERT INTO job_facet_refresh (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
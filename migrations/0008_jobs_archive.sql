@@ -0,0 +1,18 @@
+-- Cold storage for jobs past their closing date or retention window.
+-- Rows keep their id so /jobs/{job_id} can still find them.
+CREATE TABLE IF NOT EXISTS jobs_archive (LIKE jobs INCLUDING DEFAULTS);
+ALTER TABLE jobs_archive DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE jobs_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'jobs_archive_pkey') THEN
+        ALTER TABLE jobs_archive ADD CONSTRAINT jobs_archive_pkey PRIMARY KEY (id);
+    END IF;
+END $$;
+
+-- The scraper checks archived links so expired postings are not re-inserted
+CREATE INDEX IF NOT EXISTS idx_jobs_archive_link ON jobs_archive (link);
+
+-- Archival scans for expired rows
+CREATE INDEX IF NOT EXISTS idx_jobs_closing_date ON jobs (closing_date) WHERE closing_date IS NOT NULL;
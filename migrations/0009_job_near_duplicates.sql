@@ -0,0 +1,20 @@
+-- MinHash signatures for near-duplicate detection (app/scraper/dedup.py).
+-- duplicate_of points at the first job of a cluster; NULL marks a canonical job.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS minhash BIGINT[];
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS duplicate_of UUID;
+ALTER TABLE jobs_archive ADD COLUMN IF NOT EXISTS duplicate_of UUID;
+
+-- LSH band buckets: jobs sharing any (band, bucket) are candidate duplicates
+CREATE TABLE IF NOT EXISTS job_lsh_bands (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    job_id UUID NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, job_id)
+);
+
+-- Supports the cascade when jobs are archived
+CREATE INDEX IF NOT EXISTS idx_job_lsh_bands_job_id ON job_lsh_bands (job_id);
+
+-- Listing order over canonical jobs only, for collapsed results
+CREATE INDEX IF NOT EXISTS idx_jobs_canonical_created_at
+    ON jobs (created_at DESC, id DESC) WHERE duplicate_of IS NULL;
@@ -0,0 +1,10 @@
+-- Per-query crawl checkpoints for incremental scraping (app/scraper/crawl_state.py).
+CREATE TABLE IF NOT EXISTS scrape_crawl_state (
+    query TEXT PRIMARY KEY,
+    last_crawled_at TIMESTAMPTZ,
+    last_full_crawl_at TIMESTAMPTZ,
+    newest_posting_date DATE,
+    newest_link TEXT,
+    pages_crawled INTEGER NOT NULL DEFAULT 0,
+    jobs_saved INTEGER NOT NULL DEFAULT 0
+);
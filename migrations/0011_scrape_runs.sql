@@ -0,0 +1,36 @@
+-- Background scrape runs and recurring schedules (app/services/scrape_service.py).
+CREATE TABLE IF NOT EXISTS scrape_schedules (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    queries TEXT[] NOT NULL,
+    cron TEXT NOT NULL,
+    full_crawl BOOLEAN,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    last_run_at TIMESTAMPTZ,
+    next_run_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_schedules_due ON scrape_schedules (next_run_at) WHERE enabled;
+
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    queries TEXT[] NOT NULL,
+    full_crawl BOOLEAN,
+    schedule_id UUID REFERENCES scrape_schedules (id) ON DELETE SET NULL,
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    jobs_new INTEGER NOT NULL DEFAULT 0,
+    jobs_skipped INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    -- Refreshed while a run is in progress; a stale heartbeat means its worker died
+    heartbeat_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_created_at ON scrape_runs (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_active ON scrape_runs (heartbeat_at) WHERE status IN ('queued', 'running');